@@ -154,7 +154,7 @@ class ReviewMediaAdmin(admin.ModelAdmin):
     list_display = ('review', 'media_type', 'order', 'created_at')
     list_filter = ('media_type', 'created_at')
     search_fields = ('review__product__name',)
-    list_select_related = ('review',)
+    list_select_related = ('review__product', 'review__user')
 
 
 @admin.register(StoreReviewStats)
@@ -162,7 +162,11 @@ class StoreReviewStatsAdmin(admin.ModelAdmin):
     list_display = ('store', 'avg_rating_30d', 'total_reviews_30d', 'good_reviews_count', 'negative_reviews_count', 'last_accessed_at')
     list_filter = ('last_accessed_at',)
     search_fields = ('store__store_name',)
-    readonly_fields = ('total_reviews_30d', 'avg_rating_30d', 'good_reviews_count', 'negative_reviews_count', 'updated_at')
+    readonly_fields = (
+        'total_reviews_30d', 'rating_sum_30d', 'avg_rating_30d', 'good_reviews_count', 'negative_reviews_count',
+        'window_start', 'updated_at',
+    )
+    list_select_related = ('store',)
 
 
 @admin.register(FlashSale)
@@ -172,6 +176,7 @@ class FlashSaleAdmin(admin.ModelAdmin):
     search_fields = ('name', 'store__store_name')
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'created_at'
+    list_select_related = ('store',)
 
 
 @admin.register(FlashSaleProduct)
@@ -179,6 +184,7 @@ class FlashSaleProductAdmin(admin.ModelAdmin):
     list_display = ('flash_sale', 'product', 'flash_price', 'flash_stock')
     list_filter = ('flash_sale', 'created_at')
     search_fields = ('product__name', 'flash_sale__name')
+    list_select_related = ('flash_sale__store', 'product')
 
 
 @admin.register(DiscountCode)
@@ -188,6 +194,7 @@ class DiscountCodeAdmin(admin.ModelAdmin):
     search_fields = ('code', 'name', 'store__store_name')
     readonly_fields = ('used_count', 'created_at', 'updated_at')
     date_hierarchy = 'created_at'
+    list_select_related = ('store',)
 
 
 @admin.register(DiscountCodeProduct)
@@ -195,6 +202,7 @@ class DiscountCodeProductAdmin(admin.ModelAdmin):
     list_display = ('discount_code', 'product', 'created_at')
     list_filter = ('discount_code', 'created_at')
     search_fields = ('product__name', 'discount_code__code')
+    list_select_related = ('discount_code__store', 'product')
 
 
 @admin.register(CertificationOrganization)
@@ -237,7 +245,7 @@ class StoreVerificationRequestAdmin(admin.ModelAdmin):
     list_select_related = ('store', 'reviewed_by')
     
     def certifications_count(self, obj):
-        return obj.certifications.count()
+        return obj.cert_count
     certifications_count.short_description = 'Certifications Count'
 
 
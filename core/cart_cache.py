@@ -0,0 +1,51 @@
+"""
+Per-user cart item count for the navbar badge.
+
+The count is cached per user. add_to_cart bumps it in place, and the other cart
+mutations (remove, quantity change, checkout) drop it so the next read recounts.
+The CartItem signals in core/signals.py also drop it for saves and deletes made
+elsewhere (admin, cascades from product or variant deletes). queryset.update()
+sends no signals, so callers invalidate after it themselves.
+"""
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .models import MAX_CART_QUANTITY, CartItem
+
+CART_COUNT_CACHE_TTL = 3600  # 1 hour
+
+
+def _cart_count_key(user_id):
+    return f'cart:count:v1:{user_id}'
+
+
+def cart_count(user_id):
+    """Total quantity in the user's cart, served from cache when possible"""
+    key = _cart_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = CartItem.objects.filter(user_id=user_id).aggregate(n=Sum('quantity'))['n'] or 0
+        cache.set(key, count, CART_COUNT_CACHE_TTL)
+    return count
+
+
+def bump_cart_count(user_id, quantity, line_quantity):
+    """
+    Add quantity to the cached count after items are added, and return the new total.
+    
+    line_quantity is the line's quantity returned by CartItem.objects.add(); a line at
+    MAX_CART_QUANTITY may have been clamped, so the count is recounted instead.
+    """
+    if line_quantity >= MAX_CART_QUANTITY:
+        invalidate_cart_count(user_id)
+        return cart_count(user_id)
+    try:
+        return cache.incr(_cart_count_key(user_id), quantity)
+    except ValueError:
+        # Not cached yet: the recount already includes the new items
+        return cart_count(user_id)
+
+
+def invalidate_cart_count(user_id):
+    """Forget the cached count after cart lines are removed or changed"""
+    cache.delete(_cart_count_key(user_id))
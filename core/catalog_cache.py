@@ -0,0 +1,26 @@
+"""
+Cross-request cache for rarely-changing catalog data.
+
+Entries are dropped by the Category signals in core/signals.py, so admin,
+dashboard and shell edits all invalidate them.
+"""
+from django.core.cache import cache
+
+from .models import Category
+
+CATEGORIES_CACHE_KEY = 'catalog:categories:v1'
+CATEGORIES_CACHE_TTL = 3600  # 1 hour; signals drop it on every change
+
+
+def all_categories():
+    """All categories in default order, served from cache when possible"""
+    categories = cache.get(CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = list(Category.objects.all())
+        cache.set(CATEGORIES_CACHE_KEY, categories, CATEGORIES_CACHE_TTL)
+    return categories
+
+
+def invalidate_categories():
+    """Forget the cached category list after a category changes"""
+    cache.delete(CATEGORIES_CACHE_KEY)
@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cart_cache import cart_count
+
+
+def cart(request):
+    """Expose the navbar cart badge count; only looked up when a template renders it"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'cart_count': SimpleLazyObject(lambda: cart_count(user.pk))}
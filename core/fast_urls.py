@@ -0,0 +1,55 @@
+"""
+Cached URL building for redirects on hot POST paths.
+
+reverse() walks the resolver on every call. These helpers reverse each route
+once per script prefix, keep the result (or a format string for routes with
+integer arguments) and build later URLs with plain string formatting.
+"""
+from functools import lru_cache
+
+from django.http import HttpResponseRedirect
+from django.urls import get_script_prefix, reverse
+
+
+# Placeholder value substituted for integer URL arguments while building templates
+_SENTINEL = 987654321
+
+
+def r(name):
+    """reverse() for parameterless routes, cached per name"""
+    return _reverse(name, get_script_prefix())
+
+
+@lru_cache(maxsize=256)
+def _reverse(name, script_prefix):
+    """reverse() cached per script prefix too (reverse() reads the same thread-local prefix)"""
+    return reverse(name)
+
+
+@lru_cache(maxsize=256)
+def _url_template(name, kwarg_names, script_prefix):
+    """Reverse once with sentinel ints and turn them into format placeholders"""
+    url = reverse(name, kwargs={key: _SENTINEL + i for i, key in enumerate(kwarg_names)})
+    for i, key in enumerate(kwarg_names):
+        url = url.replace(str(_SENTINEL + i), '{%s}' % key)
+    return url
+
+
+def fast_reverse(name, **kwargs):
+    """reverse() for routes whose arguments are all <int:...> converters"""
+    return _url_template(name, tuple(sorted(kwargs)), get_script_prefix()).format(**{k: int(v) for k, v in kwargs.items()})
+
+
+def fast_redirect(name, **kwargs):
+    """Drop-in for redirect(name, **kwargs) on int-only routes, skipping the resolver"""
+    return HttpResponseRedirect(fast_reverse(name, **kwargs) if kwargs else r(name))
+
+
+def product_detail_url(product_id):
+    """URL of a product detail page"""
+    return fast_reverse('product_detail', product_id=product_id)
+
+
+def store_products_url(store_id):
+    """URL of a store's product management page"""
+    return fast_reverse('store_products', store_id=store_id)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from core.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP thumb/card renditions for product images uploaded before renditions existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate renditions that already exist')
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.exclude(image='')
+        if not options['force']:
+            images = images.filter(image_card='')
+
+        generated = 0
+        for product_image in images.iterator():
+            try:
+                product_image.generate_renditions()
+            except (OSError, ValueError) as e:
+                self.stderr.write(f'Skipping image {product_image.pk}: {e}')
+                continue
+            ProductImage.objects.filter(pk=product_image.pk).update(
+                image_thumb=product_image.image_thumb.name,
+                image_card=product_image.image_card.name,
+            )
+            generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Generated renditions for {generated} images'))
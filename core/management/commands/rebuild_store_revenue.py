@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Recount Store.lifetime_revenue from order items in paid orders (e.g. after bulk order updates)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('store_ids', nargs='*', type=int, help='Only rebuild these stores')
+
+    def handle(self, *args, **options):
+        stores = Store.objects.filter(pk__in=options['store_ids']) if options['store_ids'] else None
+        updated = Store.rebuild_revenue(stores)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt lifetime revenue for {updated} stores'))
@@ -379,7 +379,11 @@ def store_discount_code_delete(request, store_id, discount_code_id):
 def get_store_products_ajax(request, store_id):
     """Get store products for AJAX product selection modal"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
-    products = Product.objects.filter(store=store).order_by('-created_at')
+    # Only the columns the modal needs (skips description and other wide columns)
+    products = Product.objects.filter(store=store).select_related('primary_image').only(
+        'product_id', 'name', 'price', 'has_variants',
+        'primary_image', 'primary_image__image', 'primary_image__image_card',
+    ).order_by('-created_at')
     
     search_query = request.GET.get('search', '')
     if search_query:
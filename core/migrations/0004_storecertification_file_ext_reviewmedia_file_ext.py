@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+def populate_file_ext(apps, schema_editor):
+    """Backfill file_ext for rows uploaded before the column existed"""
+    for model_name, file_field in (('StoreCertification', 'document'), ('ReviewMedia', 'file')):
+        model = apps.get_model('core', model_name)
+        for obj in model.objects.only('pk', file_field).iterator():
+            name = getattr(obj, file_field).name
+            if name:
+                model.objects.filter(pk=obj.pk).update(file_ext=name.rsplit('.', 1)[-1].lower()[:8])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_product_base_unit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reviewmedia',
+            name='file_ext',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=8, verbose_name='File Extension'),
+        ),
+        migrations.AddField(
+            model_name='storecertification',
+            name='file_ext',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=8, verbose_name='File Extension'),
+        ),
+        migrations.RunPython(populate_file_ext, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_cert_count(apps, schema_editor):
+    """Backfill cert_count from existing certifications"""
+    StoreVerificationRequest = apps.get_model('core', 'StoreVerificationRequest')
+    StoreCertification = apps.get_model('core', 'StoreCertification')
+    counts = StoreCertification.objects.filter(
+        verification_request=OuterRef('pk')
+    ).order_by().values('verification_request').annotate(n=Count('pk')).values('n')
+    StoreVerificationRequest.objects.update(cert_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_storecertification_file_ext_reviewmedia_file_ext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storeverificationrequest',
+            name='cert_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Certifications Count'),
+        ),
+        migrations.RunPython(populate_cert_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:05
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_storeverificationrequest_cert_count'),
+    ]
+
+    # A concrete column cannot be altered into a generated one, so it is
+    # dropped and re-added; the database recomputes it for existing rows.
+    operations = [
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='total_price',
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='total_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('unit_price')), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Total Price'),
+        ),
+    ]
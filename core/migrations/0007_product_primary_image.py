@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_primary_image(apps, schema_editor):
+    """Point every product at its order=0 (or first) gallery image"""
+    Product = apps.get_model('core', 'Product')
+    ProductImage = apps.get_model('core', 'ProductImage')
+    for product_id in Product.objects.values_list('pk', flat=True).iterator():
+        images = ProductImage.objects.filter(product_id=product_id).order_by('order', 'created_at')
+        primary = images.filter(order=0).first() or images.first()
+        if primary:
+            Product.objects.filter(pk=product_id).update(primary_image=primary)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_orderitem_total_price_generated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.productimage', verbose_name='Primary Image'),
+        ),
+        migrations.RunPython(populate_primary_image, migrations.RunPython.noop),
+    ]
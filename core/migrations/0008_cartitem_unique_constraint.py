@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:02
+
+from django.db import migrations, models
+
+# unique_together let rows with a NULL variant repeat, so existing carts may hold
+# several lines for the same (user, product). Fold them into the lowest pk first,
+# or adding the constraint fails.
+MERGE_DUPLICATE_LINES = [
+    """
+    UPDATE core_cartitem AS line
+    SET quantity = dup.total
+    FROM (
+        SELECT MIN(cart_item_id) AS keep_id, SUM(quantity) AS total
+        FROM core_cartitem
+        GROUP BY user_id, product_id, variant_id
+        HAVING COUNT(*) > 1
+    ) AS dup
+    WHERE line.cart_item_id = dup.keep_id
+    """,
+    """
+    DELETE FROM core_cartitem AS line
+    USING core_cartitem AS kept
+    WHERE line.user_id = kept.user_id
+      AND line.product_id = kept.product_id
+      AND line.variant_id IS NOT DISTINCT FROM kept.variant_id
+      AND line.cart_item_id > kept.cart_item_id
+    """,
+]
+
+
+# nulls_distinct=False is UNIQUE NULLS NOT DISTINCT, which requires PostgreSQL 15+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='cartitem',
+            unique_together=set(),
+        ),
+        migrations.RunSQL(MERGE_DUPLICATE_LINES, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('user', 'product', 'variant'), name='cartitem_unique_user_product_variant', nulls_distinct=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_cartitem_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='image_card',
+            field=models.ImageField(blank=True, editable=False, upload_to='products/gallery/card/', verbose_name='Card Image (WebP)'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_thumb',
+            field=models.ImageField(blank=True, editable=False, upload_to='products/gallery/thumb/', verbose_name='Thumbnail (WebP)'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:45
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_productimage_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storecertification',
+            name='uploaded_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), verbose_name='Uploaded At'),
+        ),
+        migrations.AlterField(
+            model_name='storeverificationrequest',
+            name='submitted_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), verbose_name='Submitted At'),
+        ),
+    ]
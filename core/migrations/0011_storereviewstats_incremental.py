@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-17 12:10
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+
+def rebuild_review_stats(apps, schema_editor):
+    """Recount every stats row once so the incremental counters start from a correct base"""
+    StoreReviewStats = apps.get_model('core', 'StoreReviewStats')
+    Review = apps.get_model('core', 'Review')
+    window_start = timezone.now() - timedelta(days=30)
+    for stats in StoreReviewStats.objects.all():
+        totals = Review.objects.filter(
+            product__store_id=stats.store_id,
+            created_at__gte=window_start,
+            is_approved=True
+        ).aggregate(
+            total=Count('review_id'),
+            rating_sum=Sum('rating'),
+            good=Count('review_id', filter=Q(rating__gte=4)),
+            negative=Count('review_id', filter=Q(rating__lte=2)),
+        )
+        StoreReviewStats.objects.filter(pk=stats.pk).update(
+            window_start=window_start,
+            total_reviews_30d=totals['total'],
+            rating_sum_30d=totals['rating_sum'] or 0,
+            good_reviews_count=totals['good'],
+            negative_reviews_count=totals['negative'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_db_default_timestamps'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='storereviewstats',
+            name='avg_rating_30d',
+        ),
+        migrations.AddField(
+            model_name='storereviewstats',
+            name='rating_sum_30d',
+            field=models.IntegerField(default=0, verbose_name='Rating Sum (30 days)'),
+        ),
+        migrations.AddField(
+            model_name='storereviewstats',
+            name='window_start',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Reviews created before this are no longer counted', null=True, verbose_name='Window Start'),
+        ),
+        migrations.RunPython(rebuild_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_storereviewstats_incremental'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_item__isnull', False)), fields=('user', 'order_item'), name='review_unique_user_orderitem'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_review_unique_user_orderitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-view_count'], name='product_view_count_desc_idx'),
+        ),
+    ]
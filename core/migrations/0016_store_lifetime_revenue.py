@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:10
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_lifetime_revenue(apps, schema_editor):
+    Store = apps.get_model('core', 'Store')
+    Order = apps.get_model('core', 'Order')
+    OrderItem = apps.get_model('core', 'OrderItem')
+    paid_total = Order.objects.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef('pk'), product__store=OuterRef(OuterRef('pk')))),
+        payment_status='paid',
+    ).order_by().values('payment_status').annotate(total=Sum('total_amount')).values('total')
+    Store.objects.update(
+        lifetime_revenue=Coalesce(Subquery(paid_total), 0, output_field=models.DecimalField(max_digits=14, decimal_places=2))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='lifetime_revenue',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, verbose_name='Lifetime Revenue'),
+        ),
+        migrations.RunPython(backfill_lifetime_revenue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_store_lifetime_revenue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['store', '-created_at'], name='product_store_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='storeverificationrequest',
+            index=models.Index(fields=['status', '-submitted_at'], name='verif_req_status_submitted_idx'),
+        ),
+    ]
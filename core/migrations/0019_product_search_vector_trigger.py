@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:00
+
+from django.db import migrations
+
+# Same document as core.models.product_search_vector(); a trigger also covers
+# queryset.update() and bulk_create, which never reach a post_save receiver
+CREATE_TRIGGER = [
+    """
+    CREATE OR REPLACE FUNCTION core_product_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('simple'::regconfig, COALESCE(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_product_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, description ON core_product
+        FOR EACH ROW EXECUTE FUNCTION core_product_search_vector_update()
+    """,
+]
+
+DROP_TRIGGER = [
+    'DROP TRIGGER IF EXISTS core_product_search_vector_trigger ON core_product',
+    'DROP FUNCTION IF EXISTS core_product_search_vector_update()',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_product_name_trigram_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+    ]
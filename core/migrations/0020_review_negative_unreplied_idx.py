@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_product_search_vector_trigger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True), ('rating__lte', 2), ('seller_reply__isnull', True)), fields=['product', '-created_at'], name='review_negative_unreplied_idx'),
+        ),
+    ]
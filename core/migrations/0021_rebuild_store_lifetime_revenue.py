@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 16:00
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def rebuild_lifetime_revenue(apps, schema_editor):
+    # Same recount as Store.rebuild_revenue(): lifetime_revenue is now the sum of
+    # the store's order item totals in paid orders, not of whole order totals
+    Store = apps.get_model('core', 'Store')
+    OrderItem = apps.get_model('core', 'OrderItem')
+    paid_total = OrderItem.objects.filter(
+        order__payment_status='paid',
+        product__store=OuterRef('pk'),
+    ).order_by().values('product__store').annotate(total=Sum('total_price')).values('total')
+    Store.objects.update(lifetime_revenue=Coalesce(
+        Subquery(paid_total), Decimal('0'), output_field=models.DecimalField(max_digits=14, decimal_places=2)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_review_negative_unreplied_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_lifetime_revenue, migrations.RunPython.noop),
+    ]
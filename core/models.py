@@ -1,9 +1,46 @@
-from django.db import models
+import os
+import re
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, SearchVectorField, TrigramWordSimilarity
+)
+from django.core.files.base import ContentFile
+from django.db import connections, models, transaction
+from django.db.models.functions import Coalesce, Now
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 from django.core.validators import RegexValidator
 
 
+# File extensions rendered inline as images (certifications, review media)
+IMAGE_EXTS = frozenset(('jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp'))
+
+# WebP renditions generated at upload time: name -> (max width, max height)
+IMAGE_RENDITIONS = {
+    'thumb': (160, 160),
+    'card': (480, 480),
+}
+
+
+def make_webp_rendition(field_file, size, quality=75):
+    """Resize an image file to fit within size and return it as a WebP ContentFile"""
+    field_file.seek(0)
+    with Image.open(field_file) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(size)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        buffer = BytesIO()
+        img.save(buffer, format='WEBP', quality=quality, method=4)
+    field_file.seek(0)
+    base = os.path.splitext(os.path.basename(field_file.name))[0]
+    return ContentFile(buffer.getvalue(), name=f"{base}_{size[0]}.webp")
+
+
 # Abstract Base Model with created_at and updated_at
 class TimeStampedModel(models.Model):
     """Abstract base model with automatic created_at and updated_at"""
@@ -116,6 +153,13 @@ class Address(TimeStampedModel):
         return f"{self.contact_person} - {self.street}, {self.ward}, {self.province}"
 
 
+# Store QuerySet
+class StoreQuerySet(models.QuerySet):
+    def card_fields(self):
+        """Load only the columns needed to render a store card or link"""
+        return self.only('store_id', 'user_id', 'store_name', 'is_verified_status')
+
+
 # Store Model
 class Store(TimeStampedModel):
     store_id = models.AutoField(primary_key=True)
@@ -133,6 +177,11 @@ class Store(TimeStampedModel):
         ],
         verbose_name='Verification Status'
     )
+    # Sum of the store's order item totals in paid orders, maintained by the Order/OrderItem
+    # signals in core.signals; Store.rebuild_revenue() (manage.py rebuild_store_revenue) recounts it
+    lifetime_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False, verbose_name='Lifetime Revenue')
+
+    objects = StoreQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Store'
@@ -158,6 +207,34 @@ class Store(TimeStampedModel):
             ).first()
             self._verified_at_cache = approved_request.reviewed_at if approved_request else None
         return self._verified_at_cache
+    
+    @classmethod
+    def add_revenue(cls, product_id, amount):
+        """Add amount (negative to subtract) to the lifetime_revenue of the store selling product_id"""
+        if not amount:
+            return 0
+        return cls.objects.filter(products=product_id).update(lifetime_revenue=models.F('lifetime_revenue') + amount)
+    
+    @classmethod
+    def add_order_revenue(cls, order_id, sign=1):
+        """Credit (sign=1) or debit (sign=-1) each store with its items' totals in order_id, in one UPDATE"""
+        items = OrderItem.objects.filter(order_id=order_id, product__store=models.OuterRef('pk'))
+        item_total = items.order_by().values('order_id').annotate(total=models.Sum('total_price')).values('total')
+        return cls.objects.filter(models.Exists(items)).update(
+            lifetime_revenue=models.F('lifetime_revenue') + sign * models.Subquery(item_total)
+        )
+    
+    @classmethod
+    def rebuild_revenue(cls, stores=None):
+        """Recount lifetime_revenue from paid order items (all stores, or the given queryset)"""
+        paid_total = OrderItem.objects.filter(
+            order__payment_status='paid',
+            product__store=models.OuterRef('pk'),
+        ).order_by().values('product__store').annotate(total=models.Sum('total_price')).values('total')
+        stores = cls.objects.all() if stores is None else stores
+        return stores.update(lifetime_revenue=Coalesce(
+            models.Subquery(paid_total), Decimal('0'), output_field=cls._meta.get_field('lifetime_revenue')
+        ))
 
 
 # Store Verification Request Model
@@ -176,7 +253,7 @@ class StoreVerificationRequest(models.Model):
         default='pending',
         verbose_name='Status'
     )
-    submitted_at = models.DateTimeField(default=timezone.now, verbose_name='Submitted At')
+    submitted_at = models.DateTimeField(db_default=Now(), verbose_name='Submitted At')
     reviewed_at = models.DateTimeField(null=True, blank=True, verbose_name='Reviewed At')
     reviewed_by = models.ForeignKey(
         CustomUser,
@@ -187,11 +264,16 @@ class StoreVerificationRequest(models.Model):
         verbose_name='Reviewed By'
     )
     admin_notes = models.TextField(blank=True, null=True, verbose_name='Admin Notes')
+    # Maintained by core.signals on StoreCertification create/delete
+    cert_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='Certifications Count')
     
     class Meta:
         verbose_name = 'Store Verification Request'
         verbose_name_plural = 'Store Verification Requests'
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['status', '-submitted_at'], name='verif_req_status_submitted_idx'),
+        ]
     
     def __str__(self):
         return f"Request #{self.request_id} - {self.store.store_name} - {self.get_status_display()}"
@@ -199,7 +281,7 @@ class StoreVerificationRequest(models.Model):
     @property
     def certifications_count(self):
         """Get the number of certifications in this request"""
-        return self.certifications.count()
+        return self.cert_count
 
 
 # Certification Organization Model
@@ -237,7 +319,8 @@ class StoreCertification(models.Model):
     issue_date = models.DateField(null=True, blank=True, verbose_name='Issue Date')
     expiry_date = models.DateField(null=True, blank=True, verbose_name='Expiry Date')
     document = models.FileField(upload_to='certifications/', verbose_name='Certificate Document')
-    uploaded_at = models.DateTimeField(default=timezone.now, verbose_name='Uploaded At')
+    file_ext = models.CharField(max_length=8, blank=True, db_index=True, editable=False, verbose_name='File Extension')
+    uploaded_at = models.DateTimeField(db_default=Now(), verbose_name='Uploaded At')
     
     class Meta:
         verbose_name = 'Store Certification'
@@ -249,18 +332,85 @@ class StoreCertification(models.Model):
         store_name = self.verification_request.store.store_name if self.verification_request and self.verification_request.store else "Unknown"
         return f"{store_name} - {org_name}"
     
+    def prepare_file_ext(self):
+        """Store the document extension once so listings don't parse file names"""
+        self.file_ext = self.document.name.rsplit('.', 1)[-1].lower()[:8] if self.document else ''
+    
+    def save(self, *args, **kwargs):
+        self.prepare_file_ext()
+        super().save(*args, **kwargs)
+    
     @property
     def file_extension(self):
         """Get file extension for display purposes"""
-        if self.document:
-            return self.document.name.split('.')[-1].lower()
-        return None
+        return self.file_ext or None
     
     @property
     def is_image(self):
         """Check if the uploaded file is an image"""
-        image_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp']
-        return self.file_extension in image_extensions
+        return self.file_ext in IMAGE_EXTS
+
+# Product QuerySet
+def product_search_vector():
+    """Weighted tsvector over product name (A) and description (B)"""
+    # 'simple' config: catalogue text mixes Vietnamese and English, so no stemming or stop words
+    # Keep in sync with the core_product trigger in migration 0019, which builds the same document
+    return (
+        SearchVector('name', weight='A', config='simple')
+        + SearchVector('description', weight='B', config='simple')
+    )
+
+
+class ProductQuerySet(models.QuerySet):
+    # Columns rendered by the product card templates (includes/product_card*.html)
+    LIST_FIELDS = (
+        'product_id', 'name', 'description', 'price', 'view_count', 'has_variants',
+        'store', 'store__store_name',
+        'category', 'category__name',
+        'primary_image', 'primary_image__image', 'primary_image__image_card',
+    )
+
+    def list_fields(self, *extra_fields):
+        """
+        Load only the columns used by product list pages, joining store, category
+        and primary image and prefetching active variants for the price helpers.
+        
+        Args:
+            *extra_fields: Additional columns a specific page needs (e.g. 'SKU')
+        """
+        return self.select_related('store', 'category', 'primary_image').only(
+            *self.LIST_FIELDS, *extra_fields
+        ).prefetch_related(
+            # One query per page for the cards' display_price instead of one per variant product
+            models.Prefetch('variants', queryset=ProductVariant.objects.filter(is_active=True))
+        )
+
+    def search(self, query):
+        """
+        Match products whose name or description contains words starting with
+        each term of query, or whose name is a close (typo-tolerant) match,
+        best matches first.
+        
+        Uses the GIN-indexed search_vector and trigram name index, and falls
+        back to icontains for queries without any word characters.
+        """
+        terms = re.findall(r'[^\W_]+', query)
+        if not terms:
+            return self.filter(models.Q(name__icontains=query) | models.Q(description__icontains=query))
+        
+        # Terms are letters and digits only, so building a raw prefix query is safe
+        search_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+        return self.filter(
+            models.Q(search_vector=search_query) | models.Q(name__trigram_word_similar=query)
+        ).annotate(
+            search_rank=SearchRank(models.F('search_vector'), search_query),
+            name_similarity=TrigramWordSimilarity(query, 'name'),
+        ).order_by('-search_rank', '-name_similarity', '-view_count')
+
+    def refresh_search_vector(self):
+        """Recompute search_vector from name and description"""
+        return self.update(search_vector=product_search_vector())
+
 
 # Legacy Product Model (for backward compatibility during migration)
 class Product(TimeStampedModel):
@@ -277,10 +427,32 @@ class Product(TimeStampedModel):
     
     # Variant support fields
     has_variants = models.BooleanField(default=False, verbose_name='Has Variants')
+    
+    # Denormalized primary gallery image, maintained by core.signals on ProductImage changes
+    primary_image = models.ForeignKey(
+        'ProductImage',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Primary Image'
+    )
+    
+    # Full-text document for name/description, kept current by a database trigger (migration 0019)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
+        indexes = [
+            models.Index(fields=['-view_count'], name='product_view_count_desc_idx'),
+            models.Index(fields=['store', '-created_at'], name='product_store_created_idx'),
+            GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+            GinIndex(fields=['name'], name='product_name_trgm_gin', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.name
@@ -299,8 +471,7 @@ class Product(TimeStampedModel):
         """
         if primary_only:
             # Return primary image (order=0) or first image
-            primary_image = self.images.filter(order=0).first() or self.images.first()
-            return primary_image
+            return self.primary_image if self.primary_image_id else None
         else:
             # Return all images in order
             return self.images.all().order_by('order', 'created_at')
@@ -309,41 +480,44 @@ class Product(TimeStampedModel):
     def get_primary_image(self):
         """
         Property for backward compatibility - returns primary image (ImageField object)
-        Use get_images(primary_only=True) instead
+        Serves the card-size WebP rendition when it exists, otherwise the original.
+        Use select_related('primary_image') in list views to avoid a query per product
         """
-        primary_image = self.get_images(primary_only=True)
-        if primary_image:
-            return primary_image.image
+        if self.primary_image_id:
+            return self.primary_image.image_card or self.primary_image.image
         return None
     
+    def active_variants(self):
+        """Active variants in creation order, reusing prefetch_related('variants') when present"""
+        if not self.has_variants:
+            return []
+        if 'variants' in getattr(self, '_prefetched_objects_cache', {}):
+            return [v for v in self.variants.all() if v.is_active]
+        return list(self.variants.filter(is_active=True))
+    
     @property
     def min_price(self):
         """Get minimum price from variants or product price"""
-        if self.has_variants and self.variants.exists():
-            return min(v.price for v in self.variants.filter(is_active=True))
-        return self.price
+        active_variants = self.active_variants()
+        return min(v.price for v in active_variants) if active_variants else self.price
     
     @property
     def max_price(self):
         """Get maximum price from variants or product price"""
-        if self.has_variants and self.variants.exists():
-            return max(v.price for v in self.variants.filter(is_active=True))
-        return self.price
+        active_variants = self.active_variants()
+        return max(v.price for v in active_variants) if active_variants else self.price
     
     @property
     def display_price(self):
         """Get display price: minimum variant price if has variants, otherwise product price"""
-        if self.has_variants and self.variants.exists():
-            active_variants = self.variants.filter(is_active=True)
-            if active_variants.exists():
-                return min(v.price for v in active_variants)
-        return self.price
+        return self.min_price
     
     @property
     def default_variant(self):
         """Get default variant (first variant or variant with lowest price)"""
-        if self.has_variants and self.variants.exists():
-            return self.variants.filter(is_active=True).order_by('price', 'created_at').first()
+        active_variants = self.active_variants()
+        if active_variants:
+            return min(active_variants, key=lambda v: (v.price, v.created_at))
         return None
 
 
@@ -351,6 +525,8 @@ class ProductImage(TimeStampedModel):
     product_image_id = models.AutoField(primary_key=True)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images', verbose_name='Product')
     image = models.ImageField(upload_to='products/gallery/', verbose_name='Image')
+    image_thumb = models.ImageField(upload_to='products/gallery/thumb/', blank=True, editable=False, verbose_name='Thumbnail (WebP)')
+    image_card = models.ImageField(upload_to='products/gallery/card/', blank=True, editable=False, verbose_name='Card Image (WebP)')
     alt_text = models.CharField(max_length=255, blank=True, null=True, verbose_name='Alt Text')
     order = models.PositiveIntegerField(default=0, verbose_name='Order', help_text='Image with order=0 will be the primary image')
 
@@ -361,6 +537,50 @@ class ProductImage(TimeStampedModel):
 
     def __str__(self):
         return f"{self.product.name} - {self.alt_text or 'Image'}"
+    
+    def save(self, *args, **kwargs):
+        """Generate WebP renditions once, when a new image is uploaded"""
+        self.prepare_renditions()
+        super().save(*args, **kwargs)
+    
+    def prepare_renditions(self):
+        """
+        Generate renditions for a new upload; also used before bulk_create, which skips save().
+        
+        Saves that don't replace the file never decode it again; the generate_image_renditions
+        command backfills images that have no renditions.
+        """
+        if self.image and not self.image._committed:
+            try:
+                self.generate_renditions()
+            except (OSError, ValueError):
+                # Not a decodable image - templates fall back to the original
+                pass
+    
+    def generate_renditions(self):
+        """Build the thumb/card WebP files from the original image (does not save the row)"""
+        for name, size in IMAGE_RENDITIONS.items():
+            rendition = make_webp_rendition(self.image, size)
+            getattr(self, f'image_{name}').save(rendition.name, rendition, save=False)
+    
+    @property
+    def card_url(self):
+        """URL of the card-size rendition, falling back to the original"""
+        return (self.image_card or self.image).url
+    
+    @property
+    def thumb_url(self):
+        """URL of the thumbnail rendition, falling back to the original"""
+        return (self.image_thumb or self.image).url
+
+
+class OutOfStock(Exception):
+    """Raised when a variant does not have enough stock left for a purchase"""
+
+    def __init__(self, variant, quantity):
+        self.variant = variant
+        self.quantity = quantity
+        super().__init__(f"Not enough stock for {variant} (requested {quantity})")
 
 
 # Product Variant Model (SKU)
@@ -411,6 +631,63 @@ class ProductVariant(TimeStampedModel):
     def is_in_stock(self):
         """Check if in stock"""
         return self.stock > 0
+    
+    def decrement_stock(self, quantity):
+        """Atomically take quantity from stock in one UPDATE; raises OutOfStock if not enough left"""
+        affected = ProductVariant.objects.filter(
+            pk=self.pk, is_active=True, stock__gte=quantity
+        ).update(stock=models.F('stock') - quantity)
+        if not affected:
+            raise OutOfStock(self, quantity)
+        self.stock -= quantity
+
+
+# Upper bound for a single cart line quantity
+MAX_CART_QUANTITY = 999
+
+
+# Cart Item QuerySet
+class CartItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate unit price (variant price, else product price) and line total in SQL"""
+        unit = Coalesce('variant__price', 'product__price')
+        return self.annotate(
+            unit=unit,
+            line_total=models.ExpressionWrapper(
+                models.F('quantity') * unit,
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            )
+        )
+    
+    def cart_total(self):
+        """Sum of line totals computed by the database in a single query"""
+        return self.with_totals().aggregate(total=models.Sum('line_total'))['total'] or Decimal('0')
+    
+    def add(self, user, product, variant=None, quantity=1):
+        """
+        Add quantity to the user's cart line for product/variant, creating the line if missing.
+        
+        A single INSERT ... ON CONFLICT DO UPDATE, so concurrent adds never race;
+        the accumulated quantity is capped at MAX_CART_QUANTITY.
+        
+        Returns:
+            int: The line's quantity after the add (MAX_CART_QUANTITY if the cap applied)
+        """
+        table = self.model._meta.db_table
+        now = timezone.now()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (user_id, product_id, variant_id, quantity, created_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT ON CONSTRAINT cartitem_unique_user_product_variant
+                DO UPDATE SET quantity = LEAST({table}.quantity + EXCLUDED.quantity, %s),
+                              updated_at = EXCLUDED.updated_at
+                RETURNING quantity
+                """,
+                [user.pk, product.pk, variant.pk if variant else None, quantity, now, now, MAX_CART_QUANTITY],
+            )
+            return cursor.fetchone()[0]
 
 
 # Cart Item Model
@@ -421,10 +698,18 @@ class CartItem(TimeStampedModel):
     variant = models.ForeignKey('ProductVariant', on_delete=models.CASCADE, related_name='cart_items', null=True, blank=True, verbose_name='Variant')
     quantity = models.IntegerField(default=1, verbose_name='Quantity')
 
+    objects = CartItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Cart Item'
         verbose_name_plural = 'Cart Items'
-        unique_together = ('user', 'product', 'variant')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'product', 'variant'],
+                nulls_distinct=False,
+                name='cartitem_unique_user_product_variant',
+            ),
+        ]
 
     def __str__(self):
         variant_str = f" - {self.variant.variant_name}" if self.variant else ""
@@ -432,14 +717,19 @@ class CartItem(TimeStampedModel):
     
     @property
     def total_price(self):
-        """Calculate total price based on variant or product"""
-        price = self.variant.price if self.variant else self.product.price
-        return price * self.quantity
+        """Calculate total price based on variant or product (uses with_totals() annotation if present)"""
+        line_total = getattr(self, 'line_total', None)
+        if line_total is not None:
+            return line_total
+        return self.unit_price * self.quantity
     
     @property
     def unit_price(self):
-        """Get unit price"""
-        return self.variant.price if self.variant else self.product.price
+        """Get unit price (uses with_totals() annotation if present)"""
+        unit = getattr(self, 'unit', None)
+        if unit is not None:
+            return unit
+        return self.variant.price if self.variant_id else self.product.price
 
 
 # Order Model
@@ -490,9 +780,17 @@ class Order(TimeStampedModel):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.order_id} - {self.user.email} - {self.get_status_display()}"
+    
+    def save(self, *args, **kwargs):
+        # Store.lifetime_revenue is adjusted by the save signals; keep it in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 # Order Item Model
@@ -503,7 +801,12 @@ class OrderItem(models.Model):
     variant = models.ForeignKey('ProductVariant', on_delete=models.SET_NULL, null=True, blank=True, related_name='order_items', verbose_name='Variant')
     quantity = models.IntegerField(verbose_name='Quantity')
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Unit Price')
-    total_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Total Price')
+    total_price = models.GeneratedField(
+        expression=models.F('quantity') * models.F('unit_price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        verbose_name='Total Price'
+    )
     
     class Meta:
         verbose_name = 'Order Item'
@@ -511,17 +814,24 @@ class OrderItem(models.Model):
     
     def __str__(self):
         variant_str = f" - {self.variant.variant_name}" if self.variant else ""
-        return f"{self.quantity} x {self.product.name}{variant_str} in order #{self.order.order_id}"
+        return f"{self.quantity} x {self.product.name}{variant_str} in order #{self.order_id}"
     
     def save(self, *args, **kwargs):
         # If unit_price is not set, get from variant or product
+        # (total_price is computed by the database from quantity * unit_price)
         if not self.unit_price:
-            if self.variant:
+            if self.variant_id:
                 self.unit_price = self.variant.price
             else:
                 self.unit_price = self.product.price
-        self.total_price = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
+        # Store.lifetime_revenue is adjusted by the save signals; keep it in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    @property
+    def revenue(self):
+        """What this item adds to its store's lifetime_revenue while the order is paid"""
+        return self.quantity * self.unit_price
 
 
 # Review Model
@@ -550,7 +860,22 @@ class Review(TimeStampedModel):
     class Meta:
         verbose_name = 'Product Review'
         verbose_name_plural = 'Product Reviews'
-        unique_together = ('user', 'order_item')
+        indexes = [
+            models.Index(fields=['product', 'is_approved', '-created_at'], name='review_product_approved_idx'),
+            # Small partial index for the review dashboard's "negative, awaiting reply" list
+            models.Index(
+                fields=['product', '-created_at'],
+                condition=models.Q(is_approved=True, rating__lte=2, seller_reply__isnull=True),
+                name='review_negative_unreplied_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'order_item'],
+                condition=models.Q(order_item__isnull=False),
+                name='review_unique_user_orderitem',
+            ),
+        ]
         ordering = ['-created_at']
     
     def __str__(self):
@@ -572,6 +897,7 @@ class ReviewMedia(TimeStampedModel):
     media_id = models.AutoField(primary_key=True)
     review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='media_files', verbose_name='Review')
     file = models.FileField(upload_to='reviews/media/', verbose_name='File')
+    file_ext = models.CharField(max_length=8, blank=True, db_index=True, editable=False, verbose_name='File Extension')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPE_CHOICES, verbose_name='Media Type')
     order = models.PositiveIntegerField(default=0, verbose_name='Order')
     
@@ -581,16 +907,34 @@ class ReviewMedia(TimeStampedModel):
         ordering = ['order', 'created_at']
     
     def __str__(self):
-        return f"{self.get_media_type_display()} cho review #{self.review.review_id}"
+        return f"{self.get_media_type_display()} cho review #{self.review_id}"
+    
+    def save(self, *args, **kwargs):
+        """Store the file extension once so listings don't parse file names"""
+        self.file_ext = self.file.name.rsplit('.', 1)[-1].lower()[:8] if self.file else ''
+        super().save(*args, **kwargs)
+    
+    @property
+    def file_extension(self):
+        """Get file extension for display purposes"""
+        return self.file_ext or None
+    
+    @property
+    def is_image(self):
+        """Check if the uploaded file is an image"""
+        return self.file_ext in IMAGE_EXTS
 
 
 # Product Comment Model
 # Store Review Stats Model - Cached statistics
 class StoreReviewStats(TimeStampedModel):
+    WINDOW = timedelta(days=30)
+    
     store = models.OneToOneField(Store, on_delete=models.CASCADE, related_name='review_stats', verbose_name='Store')
     last_accessed_at = models.DateTimeField(null=True, blank=True, verbose_name='Last Accessed At')
+    window_start = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Window Start', help_text='Reviews created before this are no longer counted')
     total_reviews_30d = models.IntegerField(default=0, verbose_name='Total Reviews (30 days)')
-    avg_rating_30d = models.DecimalField(max_digits=3, decimal_places=2, default=0.00, verbose_name='Average Rating (30 days)')
+    rating_sum_30d = models.IntegerField(default=0, verbose_name='Rating Sum (30 days)')
     good_reviews_count = models.IntegerField(default=0, verbose_name='Good Reviews Count (4-5 stars)')
     negative_reviews_count = models.IntegerField(default=0, verbose_name='Negative Reviews Count (1-2 stars)')
     
@@ -600,6 +944,98 @@ class StoreReviewStats(TimeStampedModel):
     
     def __str__(self):
         return f"Review statistics for {self.store.store_name}"
+    
+    @property
+    def avg_rating_30d(self):
+        """Average rating over the window, derived from the running sum and count"""
+        if not self.total_reviews_30d:
+            return Decimal('0.00')
+        return round(Decimal(self.rating_sum_30d) / self.total_reviews_30d, 2)
+    
+    @classmethod
+    def for_store(cls, store):
+        """Get the stats row for a store, building it from the reviews table the first time"""
+        stats, created = cls.objects.get_or_create(store=store)
+        if created:
+            stats.rebuild()
+        return stats
+    
+    def rebuild(self):
+        """Full recount of the 30-day window (only needed when the row is first created)"""
+        self.window_start = timezone.now() - self.WINDOW
+        totals = Review.objects.filter(
+            product__store_id=self.store_id,
+            created_at__gte=self.window_start,
+            is_approved=True
+        ).aggregate(**self._window_aggregates())
+        self.total_reviews_30d = totals['total']
+        self.rating_sum_30d = totals['rating_sum'] or 0
+        self.good_reviews_count = totals['good']
+        self.negative_reviews_count = totals['negative']
+        self.save()
+    
+    @classmethod
+    def apply_review(cls, review, sign=1):
+        """Add (sign=1) or remove (sign=-1) one approved review from its store's counters in one UPDATE"""
+        cls.objects.filter(
+            store_id=review.product.store_id,
+            window_start__lte=review.created_at,
+        ).update(
+            total_reviews_30d=models.F('total_reviews_30d') + sign,
+            rating_sum_30d=models.F('rating_sum_30d') + sign * review.rating,
+            good_reviews_count=models.F('good_reviews_count') + (sign if review.rating >= 4 else 0),
+            negative_reviews_count=models.F('negative_reviews_count') + (sign if review.rating <= 2 else 0),
+        )
+    
+    @classmethod
+    def apply_review_change(cls, old, new):
+        """Swap an edited review's old contribution (approval, rating) for its new one in one UPDATE"""
+        def counts(review):
+            if not review.is_approved:
+                return (0, 0, 0, 0)
+            return (1, review.rating, int(review.rating >= 4), int(review.rating <= 2))
+        total, rating_sum, good, negative = (n - o for n, o in zip(counts(new), counts(old)))
+        if not (total or rating_sum or good or negative):
+            return
+        cls.objects.filter(
+            store_id=new.product.store_id,
+            window_start__lte=new.created_at,
+        ).update(
+            total_reviews_30d=models.F('total_reviews_30d') + total,
+            rating_sum_30d=models.F('rating_sum_30d') + rating_sum,
+            good_reviews_count=models.F('good_reviews_count') + good,
+            negative_reviews_count=models.F('negative_reviews_count') + negative,
+        )
+    
+    @classmethod
+    def roll_window(cls):
+        """Subtract reviews that have aged out of the window since the last roll; returns stores touched"""
+        cutoff = timezone.now() - cls.WINDOW
+        expired = Review.objects.filter(
+            is_approved=True,
+            created_at__lt=cutoff,
+            created_at__gte=models.F('product__store__review_stats__window_start'),
+        ).values('product__store_id').annotate(**cls._window_aggregates()).order_by()
+        
+        with transaction.atomic():
+            for row in expired:
+                cls.objects.filter(store_id=row['product__store_id']).update(
+                    total_reviews_30d=models.F('total_reviews_30d') - row['total'],
+                    rating_sum_30d=models.F('rating_sum_30d') - row['rating_sum'],
+                    good_reviews_count=models.F('good_reviews_count') - row['good'],
+                    negative_reviews_count=models.F('negative_reviews_count') - row['negative'],
+                )
+            cls.objects.filter(window_start__lt=cutoff).update(window_start=cutoff)
+        return len(expired)
+    
+    @staticmethod
+    def _window_aggregates():
+        return {
+            'total': models.Count('review_id'),
+            'rating_sum': models.Sum('rating'),
+            'good': models.Count('review_id', filter=models.Q(rating__gte=4)),
+            'negative': models.Count('review_id', filter=models.Q(rating__lte=2)),
+        }
 
 
 # Flash Sale Model
@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from .cart_cache import invalidate_cart_count
+from .catalog_cache import invalidate_categories
+from .models import (
+    CartItem, Category, Order, OrderItem, Product, ProductImage, Review, Store, StoreCertification,
+    StoreReviewStats, StoreVerificationRequest
+)
+
+
+def refresh_primary_image(product_id):
+    """Point Product.primary_image at the image with order=0, or the first image"""
+    images = ProductImage.objects.filter(product_id=product_id)
+    primary = images.filter(order=0).first() or images.first()
+    Product.objects.filter(pk=product_id).update(primary_image=primary)
+
+
+@receiver(post_save, sender=ProductImage)
+def update_primary_image_on_save(sender, instance, created, **kwargs):
+    """Keep Product.primary_image in sync when a gallery image is added or reordered"""
+    refresh_primary_image(instance.product_id)
+
+
+@receiver(post_delete, sender=ProductImage)
+def update_primary_image_on_delete(sender, instance, **kwargs):
+    """Pick a new primary image when the current one is deleted"""
+    refresh_primary_image(instance.product_id)
+
+
+@receiver(post_save, sender=StoreCertification)
+def increment_certification_count(sender, instance, created, **kwargs):
+    """Keep StoreVerificationRequest.cert_count in sync when a certification is added"""
+    if created and instance.verification_request_id:
+        StoreVerificationRequest.objects.filter(
+            pk=instance.verification_request_id
+        ).update(cert_count=F('cert_count') + 1)
+
+
+@receiver(post_delete, sender=StoreCertification)
+def decrement_certification_count(sender, instance, **kwargs):
+    """Keep StoreVerificationRequest.cert_count in sync when a certification is removed"""
+    if instance.verification_request_id:
+        StoreVerificationRequest.objects.filter(
+            pk=instance.verification_request_id,
+            cert_count__gt=0
+        ).update(cert_count=F('cert_count') - 1)
+
+
+# Fields whose edits change a review's contribution to StoreReviewStats
+REVIEW_STATS_FIELDS = ('rating', 'is_approved')
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_stats_fields(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored rating/approval of an edited review so post_save can apply the difference"""
+    if instance._state.adding:
+        return
+    if update_fields is not None and not set(REVIEW_STATS_FIELDS) & set(update_fields):
+        return
+    instance._stats_before = Review.objects.filter(pk=instance.pk).only(*REVIEW_STATS_FIELDS).first()
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_store_stats(sender, instance, created, **kwargs):
+    """Count a new approved review, or an edit to its rating or approval, in its store's rolling stats"""
+    if created:
+        if instance.is_approved:
+            StoreReviewStats.apply_review(instance)
+        return
+    before = instance.__dict__.pop('_stats_before', None)
+    if before is not None:
+        StoreReviewStats.apply_review_change(before, instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_store_stats(sender, instance, **kwargs):
+    """Take a deleted approved review back out of its store's rolling stats"""
+    if instance.is_approved:
+        StoreReviewStats.apply_review(instance, sign=-1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def drop_cached_categories(sender, **kwargs):
+    """Invalidate the cached category list whenever a category changes"""
+    invalidate_categories()
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def drop_cached_cart_count(sender, instance, **kwargs):
+    """Invalidate the owner's cart badge count after admin edits, cascades and other saved changes"""
+    # After commit, so a concurrent request can't re-cache the old count in between
+    transaction.on_commit(lambda: invalidate_cart_count(instance.user_id))
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_payment_status(sender, instance, update_fields=None, **kwargs):
+    """Keep the stored payment status of an edited order so post_save can move its revenue"""
+    if instance._state.adding:
+        return
+    if update_fields is not None and 'payment_status' not in update_fields:
+        return
+    instance._paid_before = Order.objects.filter(pk=instance.pk, payment_status='paid').exists()
+
+
+@receiver(post_save, sender=Order)
+def move_revenue_on_payment_change(sender, instance, **kwargs):
+    """Credit the stores when an order becomes paid, debit them when it stops being paid"""
+    paid_before = instance.__dict__.pop('_paid_before', None)
+    paid = instance.payment_status == 'paid'
+    if paid_before is not None and paid_before != paid:
+        Store.add_order_revenue(instance.pk, 1 if paid else -1)
+
+
+@receiver(pre_save, sender=OrderItem)
+def remember_order_item_revenue(sender, instance, **kwargs):
+    """Keep the stored product/quantity/price of an edited item so post_save can apply the difference"""
+    if not instance._state.adding:
+        instance._revenue_before = OrderItem.objects.filter(pk=instance.pk).only(
+            'product', 'quantity', 'unit_price'
+        ).first()
+
+
+@receiver(post_save, sender=OrderItem)
+def add_order_item_revenue(sender, instance, **kwargs):
+    """Apply a new or edited item of a paid order to its store's lifetime_revenue"""
+    before = instance.__dict__.pop('_revenue_before', None)
+    if instance.order.payment_status != 'paid':
+        return
+    if before is None or before.product_id == instance.product_id:
+        Store.add_revenue(instance.product_id, instance.revenue - (before.revenue if before else 0))
+    else:
+        Store.add_revenue(before.product_id, -before.revenue)
+        Store.add_revenue(instance.product_id, instance.revenue)
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_order_item_revenue(sender, instance, **kwargs):
+    """
+    Take a deleted item of a paid order out of its store's lifetime_revenue.
+    
+    Also runs for items removed by cascades (order, product, store or user deletes),
+    which are deleted before the rows they depend on.
+    """
+    if Order.objects.filter(pk=instance.order_id, payment_status='paid').exists():
+        Store.add_revenue(instance.product_id, -instance.revenue)
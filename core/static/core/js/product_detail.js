@@ -91,16 +91,25 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         })
         .then(response => {
-            if (response.ok) {
+            const isJson = (response.headers.get('Content-Type') || '').includes('application/json');
+            return (isJson ? response.json() : Promise.resolve({})).then(data => ({ response, data }));
+        })
+        .then(({ response, data }) => {
+            if (response.ok && data.success) {
                 // Success - show green toast
                 toastIcon.className = 'fas fa-check-circle me-2 text-success';
                 toastHeader.className = 'toast-header';
                 toastMessage.textContent = 'Product added to cart successfully!';
+                const cartBadge = document.getElementById('cartCountBadge');
+                if (cartBadge && data.cart_count !== undefined) {
+                    cartBadge.textContent = data.cart_count;
+                    cartBadge.hidden = !data.cart_count;
+                }
             } else {
                 // Error - show red toast
                 toastIcon.className = 'fas fa-exclamation-triangle me-2 text-danger';
                 toastHeader.className = 'toast-header bg-danger text-white';
-                toastMessage.textContent = 'Error adding product to cart.';
+                toastMessage.textContent = data.message || 'Error adding product to cart.';
             }
             
             // Show toast
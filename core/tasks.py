@@ -0,0 +1,19 @@
+from celery import shared_task
+
+
+@shared_task(name='core.roll_store_review_stats_window')
+def roll_store_review_stats_window() -> int:
+    """Drop reviews that aged out of the 30-day window from every store's stats."""
+
+    from .models import StoreReviewStats  # Imported lazily to avoid circular imports
+
+    return StoreReviewStats.roll_window()
+
+
+@shared_task(name='core.flush_product_view_counts')
+def flush_product_view_counts() -> int:
+    """Fold view counts buffered in Redis by product_detail into Product.view_count."""
+
+    from .view_counter import flush_product_views  # Imported lazily to avoid circular imports
+
+    return flush_product_views()
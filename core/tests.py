@@ -0,0 +1,434 @@
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, set_script_prefix
+from django.utils import timezone
+
+from .paginator import FastCountPaginator
+from .cart_cache import cart_count
+from .fast_urls import fast_redirect, fast_reverse, product_detail_url, r, store_products_url
+from .models import (
+    MAX_CART_QUANTITY, CartItem, Category, CertificationOrganization, CustomUser, Order, OrderItem, Product,
+    ProductImage, ProductVariant, Review, Store, StoreCertification, StoreReviewStats, StoreVerificationRequest,
+)
+
+
+# Local cache so query counts don't depend on what a shared Redis already holds
+TEST_SETTINGS = dict(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    SESSION_ENGINE='django.contrib.sessions.backends.db',
+    USE_ELASTICSEARCH=False,
+    ELASTICSEARCH_DSL_AUTOSYNC=False,
+)
+
+
+@override_settings(**TEST_SETTINGS)
+class CatalogTestCase(TestCase):
+    """A seller with two products, one store holding a valid certificate"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = CustomUser.objects.create_user('seller@example.com', 'password', full_name='Seller')
+        cls.store = Store.objects.create(user=cls.seller, store_name='Green Farm')
+        cls.other_store = Store.objects.create(user=cls.seller, store_name='Plain Farm')
+        cls.category = Category.objects.create(name='Vegetables', slug='vegetables')
+        cls.product = Product.objects.create(store=cls.store, category=cls.category, name='Spinach', price=10)
+        cls.other_product = Product.objects.create(store=cls.other_store, category=cls.category, name='Kale', price=12)
+
+        cls.organization = CertificationOrganization.objects.create(name='USDA Organic', abbreviation='USDA')
+        request = StoreVerificationRequest.objects.create(store=cls.store, status='approved')
+        StoreCertification.objects.create(
+            verification_request=request,
+            certification_organization=cls.organization,
+            expiry_date=timezone.now().date() + timedelta(days=30),
+            document='certifications/usda.pdf',
+        )
+        # Expired certificate: must not match
+        expired_request = StoreVerificationRequest.objects.create(store=cls.other_store, status='approved')
+        StoreCertification.objects.create(
+            verification_request=expired_request,
+            certification_organization=cls.organization,
+            expiry_date=timezone.now().date() - timedelta(days=1),
+            document='certifications/old.pdf',
+        )
+
+
+class ProductListCertificateFilterTests(CatalogTestCase):
+    def test_certificate_filter_is_one_exists_subquery(self):
+        with CaptureQueriesContext(connection) as ctx, self.assertNumQueries(7):
+            response = self.client.get('/products/', {'certificate': self.organization.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p.pk for p in response.context['page_obj']], [self.product.pk])
+        product_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "core_product"' in q['sql']]
+        self.assertTrue(product_queries)
+        for sql in product_queries:
+            self.assertLessEqual(sql.count('EXISTS'), 1)
+            self.assertNotIn('DISTINCT', sql)
+
+
+class StoreProductPickerTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for index, name in enumerate(['Lettuce', 'Carrot', 'Tomato']):
+            product = Product.objects.create(store=cls.store, category=cls.category, name=name, price=5 + index)
+            # Stored file names, not uploads, so no renditions are generated
+            ProductImage.objects.create(
+                product=product, image=f'products/gallery/{name}.jpg', image_card=f'products/gallery/card/{name}.webp'
+            )
+
+    def test_picker_does_not_refetch_deferred_fields(self):
+        self.client.force_login(self.seller)
+        # Session, user, store, products: the same for any number of products
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/store/{self.store.pk}/products/ajax/')
+
+        products = response.json()['products']
+        self.assertEqual(len(products), 4)
+        self.assertEqual(products[0]['name'], 'Tomato')
+        self.assertTrue(products[0]['image_url'].endswith('Tomato.webp'))
+
+    def test_resaving_an_image_does_not_regenerate_renditions(self):
+        image = ProductImage.objects.create(product=self.product, image='products/gallery/raw.jpg')
+        with mock.patch.object(ProductImage, 'generate_renditions') as generate:
+            image.alt_text = 'Raw spinach'
+            image.save()
+        generate.assert_not_called()
+
+    def test_list_fields_joins_store_and_category(self):
+        products = list(Product.objects.filter(store=self.store, primary_image__isnull=False).list_fields())
+        with self.assertNumQueries(0):
+            rows = {(p.name, p.category.name, p.store.store_name, p.get_primary_image.name) for p in products}
+        self.assertIn(('Carrot', 'Vegetables', 'Green Farm', 'products/gallery/card/Carrot.webp'), rows)
+
+
+class FastUrlsTests(TestCase):
+    def test_fast_reverse_matches_reverse(self):
+        routes = [
+            ('product_detail', {'product_id': 7}),
+            ('store_products', {'store_id': 42}),
+            ('edit_product', {'store_id': 3, 'product_id': 1234567}),
+            ('store_order_detail', {'order_id': 9, 'store_id': 1}),
+            ('create_review', {'order_id': 987654321, 'order_item_id': 5}),
+        ]
+        for name, kwargs in routes:
+            with self.subTest(name=name, kwargs=kwargs):
+                self.assertEqual(fast_reverse(name, **kwargs), reverse(name, kwargs=kwargs))
+                # Repeated calls come from the cached template
+                self.assertEqual(fast_reverse(name, **kwargs), reverse(name, kwargs=kwargs))
+
+    def test_cache_is_per_script_prefix(self):
+        self.assertEqual(product_detail_url(3), '/products/3/')
+        set_script_prefix('/shop/')
+        try:
+            self.assertEqual(product_detail_url(3), reverse('product_detail', args=[3]))
+            self.assertEqual(r('cart'), reverse('cart'))
+            self.assertTrue(r('cart').startswith('/shop/'))
+        finally:
+            set_script_prefix('/')
+        self.assertEqual(r('cart'), reverse('cart'))
+
+    def test_helpers_match_reverse(self):
+        self.assertEqual(r('cart'), reverse('cart'))
+        self.assertEqual(product_detail_url('15'), reverse('product_detail', kwargs={'product_id': 15}))
+        self.assertEqual(store_products_url(8), reverse('store_products', kwargs={'store_id': 8}))
+        self.assertEqual(fast_redirect('cart').url, reverse('cart'))
+        self.assertEqual(fast_redirect('store_products', store_id=2).url, reverse('store_products', args=[2]))
+
+
+class CartItemAddTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.buyer = CustomUser.objects.create_user('buyer@example.com', 'password', full_name='Buyer')
+        cls.variant = ProductVariant.objects.create(product=cls.other_product, variant_name='1 kg', price=20)
+
+    def line(self, product, variant=None):
+        return CartItem.objects.get(user=self.buyer, product=product, variant=variant)
+
+    def test_insert_creates_line(self):
+        with self.assertNumQueries(1):
+            line_quantity = CartItem.objects.add(self.buyer, self.product, quantity=3)
+        self.assertEqual(line_quantity, 3)
+        self.assertEqual(self.line(self.product).quantity, 3)
+
+    def test_conflict_accumulates_quantity(self):
+        CartItem.objects.add(self.buyer, self.other_product, self.variant, 2)
+        self.assertEqual(CartItem.objects.add(self.buyer, self.other_product, self.variant, 5), 7)
+        self.assertEqual(self.line(self.other_product, self.variant).quantity, 7)
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 1)
+
+    def test_null_variant_lines_conflict(self):
+        # The unique constraint treats NULL variants as equal, so this is still one line
+        CartItem.objects.add(self.buyer, self.product)
+        self.assertEqual(CartItem.objects.add(self.buyer, self.product), 2)
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 1)
+        # A variant line for the same product is separate
+        self.assertEqual(CartItem.objects.add(self.buyer, self.other_product, self.variant), 1)
+        self.assertEqual(CartItem.objects.add(self.buyer, self.other_product), 1)
+        self.assertEqual(CartItem.objects.filter(user=self.buyer).count(), 3)
+
+    def test_accumulated_quantity_is_capped(self):
+        CartItem.objects.add(self.buyer, self.product, quantity=MAX_CART_QUANTITY - 1)
+        self.assertEqual(CartItem.objects.add(self.buyer, self.product, quantity=5), MAX_CART_QUANTITY)
+        self.assertEqual(self.line(self.product).quantity, MAX_CART_QUANTITY)
+
+
+class FastCountPaginatorTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Product.objects.bulk_create(
+            Product(store=cls.store, name=f'Product {i}', price=i) for i in range(10)
+        )
+
+    def test_unfiltered_count_uses_pg_class_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_product')
+
+        class SmallThresholdPaginator(FastCountPaginator):
+            EXACT_COUNT_THRESHOLD = 1
+
+        paginator = SmallThresholdPaginator(Product.objects.order_by('pk'), 5)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(paginator.count, 12)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('pg_class', ctx.captured_queries[0]['sql'])
+
+    def test_small_table_estimate_falls_back_to_exact_count(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(FastCountPaginator(Product.objects.order_by('pk'), 5).count, 12)
+
+    def test_filtered_count_is_cached(self):
+        queryset = Product.objects.filter(store=self.store).order_by('pk')
+        with self.assertNumQueries(1):
+            self.assertEqual(FastCountPaginator(queryset, 5).count, 11)
+        with self.assertNumQueries(0):
+            self.assertEqual(FastCountPaginator(queryset, 5).count, 11)
+        with self.assertNumQueries(1):
+            self.assertEqual(FastCountPaginator(queryset, 5, count_cache_ttl=0).count, 11)
+
+    def test_page_fetches_keys_then_rows(self):
+        queryset = Product.objects.filter(store=self.store).select_related('store').order_by('-price', 'pk')
+        paginator = FastCountPaginator(queryset, 5)
+        paginator.count  # cache the count so only the page queries are captured
+        with CaptureQueriesContext(connection) as ctx:
+            page = paginator.page(2)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        key_sql, rows_sql = (q['sql'] for q in ctx.captured_queries)
+        self.assertTrue(key_sql.startswith('SELECT "core_product"."product_id" AS "pk" FROM'))
+        self.assertIn('OFFSET 5', key_sql)
+        self.assertNotIn('OFFSET', rows_sql)
+        self.assertEqual([p.pk for p in page], list(queryset.values_list('pk', flat=True)[5:10]))
+        with self.assertNumQueries(0):
+            [p.store.store_name for p in page]
+
+
+class StoreReviewStatsTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.buyer = CustomUser.objects.create_user('reviewer@example.com', 'password', full_name='Reviewer')
+
+    def setUp(self):
+        self.stats = StoreReviewStats.for_store(self.store)
+
+    def review(self, rating, **kwargs):
+        return Review.objects.create(user=self.buyer, product=self.product, rating=rating, content='Fresh', **kwargs)
+
+    def assertStats(self, total, rating_sum, good, negative):
+        self.stats.refresh_from_db()
+        self.assertEqual(
+            (self.stats.total_reviews_30d, self.stats.rating_sum_30d,
+             self.stats.good_reviews_count, self.stats.negative_reviews_count),
+            (total, rating_sum, good, negative),
+        )
+
+    def test_create_counts_approved_reviews_only(self):
+        self.review(5)
+        self.review(1)
+        self.review(4, is_approved=False)
+        self.assertStats(2, 6, 1, 1)
+
+    def test_rating_edit_applies_difference(self):
+        review = self.review(5)
+        review.rating = 2
+        review.save()
+        self.assertStats(1, 2, 0, 1)
+        # Saving again without changes must not count the review twice
+        review.save()
+        self.assertStats(1, 2, 0, 1)
+
+    def test_approval_edit_moves_review_in_and_out(self):
+        review = self.review(4)
+        review.is_approved = False
+        review.save()
+        self.assertStats(0, 0, 0, 0)
+        review.is_approved = True
+        review.rating = 3
+        review.save()
+        self.assertStats(1, 3, 0, 0)
+
+    def test_edit_without_stats_fields_skips_lookup(self):
+        review = self.review(1)
+        review.seller_reply = 'Sorry, we will do better'
+        # Only the UPDATE: no read of the stored rating
+        with self.assertNumQueries(1):
+            review.save(update_fields=['seller_reply'])
+        self.assertStats(1, 1, 0, 1)
+
+    def test_delete_removes_review(self):
+        kept = self.review(5)
+        self.review(2).delete()
+        self.assertStats(1, 5, 1, 0)
+        kept.delete()
+        self.assertStats(0, 0, 0, 0)
+
+    def test_roll_window_drops_aged_out_reviews(self):
+        now = timezone.now()
+        StoreReviewStats.objects.filter(pk=self.stats.pk).update(window_start=now - timedelta(days=40))
+        old = self.review(5)
+        self.review(2)
+        Review.objects.filter(pk=old.pk).update(created_at=now - timedelta(days=31))
+
+        self.assertEqual(StoreReviewStats.roll_window(), 1)
+        self.assertStats(1, 2, 0, 1)
+        self.assertGreater(self.stats.window_start, now - timedelta(days=31))
+        # A second roll finds nothing new to subtract
+        StoreReviewStats.roll_window()
+        self.assertStats(1, 2, 0, 1)
+
+
+class TimestampDefaultTests(CatalogTestCase):
+    def test_database_stamps_time_and_returns_it(self):
+        with CaptureQueriesContext(connection) as ctx:
+            request = StoreVerificationRequest.objects.create(store=self.other_store)
+        # The INSERT sends DEFAULT for submitted_at and reads the stamped value back via RETURNING
+        insert, returning = ctx.captured_queries[0]['sql'].split('RETURNING')
+        self.assertIn('DEFAULT', insert)
+        self.assertIn('submitted_at', returning)
+        certifications = StoreCertification.objects.bulk_create([
+            StoreCertification(verification_request=request, document='certifications/a.pdf'),
+        ])
+        self.assertIsInstance(request.submitted_at, datetime)
+        self.assertIsInstance(certifications[0].uploaded_at, datetime)
+        request.refresh_from_db()
+        self.assertLessEqual(request.submitted_at, timezone.now())
+
+    def test_database_default_covers_raw_inserts(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO core_storeverificationrequest (store_id, status, cert_count) VALUES (%s, %s, 0) '
+                'RETURNING submitted_at',
+                [self.other_store.pk, 'pending'],
+            )
+            self.assertIsNotNone(cursor.fetchone()[0])
+
+
+class StoreLifetimeRevenueTests(CatalogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.buyer = CustomUser.objects.create_user('customer@example.com', 'password', full_name='Customer')
+
+    def order(self, payment_status='pending'):
+        return Order.objects.create(user=self.buyer, subtotal=0, total_amount=0, payment_status=payment_status)
+
+    def assertRevenue(self, store, amount):
+        store.refresh_from_db()
+        self.assertEqual(store.lifetime_revenue, amount)
+
+    def test_payment_status_moves_item_totals(self):
+        order = self.order()
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, unit_price=10)
+        self.assertRevenue(self.store, 0)
+        order.payment_status = 'paid'
+        order.save()
+        self.assertRevenue(self.store, 20)
+        order.payment_status = 'refunded'
+        order.save(update_fields=['payment_status'])
+        self.assertRevenue(self.store, 0)
+
+    def test_item_edits_on_paid_order(self):
+        order = self.order('paid')
+        item = OrderItem.objects.create(order=order, product=self.product, quantity=1, unit_price=10)
+        self.assertRevenue(self.store, 10)
+        item.quantity = 3
+        item.save()
+        self.assertRevenue(self.store, 30)
+        # Moving the item to another store's product moves its revenue too
+        item.product = self.other_product
+        item.save()
+        self.assertRevenue(self.store, 0)
+        self.assertRevenue(self.other_store, 30)
+        item.delete()
+        self.assertRevenue(self.other_store, 0)
+
+    def test_cascading_deletes_remove_revenue(self):
+        OrderItem.objects.create(order=self.order('paid'), product=self.product, quantity=1, unit_price=10)
+        kept = OrderItem.objects.create(order=self.order('paid'), product=self.product, quantity=1, unit_price=5)
+        self.assertRevenue(self.store, 15)
+        kept.order.delete()
+        self.assertRevenue(self.store, 10)
+        self.product.delete()
+        self.assertRevenue(self.store, 0)
+
+    def test_rebuild_recounts_after_bulk_updates(self):
+        order = self.order()
+        OrderItem.objects.create(order=order, product=self.product, quantity=4, unit_price=10)
+        # queryset.update() skips the signals
+        Order.objects.filter(pk=order.pk).update(payment_status='paid')
+        self.assertRevenue(self.store, 0)
+        call_command('rebuild_store_revenue', stdout=StringIO())
+        self.assertRevenue(self.store, 40)
+        self.assertRevenue(self.other_store, 0)
+
+
+class AddToCartTests(CatalogTestCase):
+    AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.buyer = CustomUser.objects.create_user('shopper@example.com', 'password', full_name='Shopper')
+
+    def setUp(self):
+        # Local-memory cache (TEST_SETTINGS) outlives a test's transaction
+        cache.clear()
+        self.client.force_login(self.buyer)
+
+    def test_ajax_add_returns_cart_count(self):
+        response = self.client.post(f'/add-to-cart/{self.product.pk}/', {'quantity': 2}, **self.AJAX)
+        self.assertEqual(response.json(), {'success': True, 'cart_count': 2})
+
+    def test_ajax_add_rejects_unknown_product(self):
+        # The deferred FK would only fail at COMMIT, so the view must check first
+        response = self.client.post('/add-to-cart/999999/', {'quantity': 1}, **self.AJAX)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CartItem.objects.filter(user=self.buyer).exists())
+
+    def test_ajax_badge_follows_capped_quantity(self):
+        url = f'/add-to-cart/{self.product.pk}/'
+        self.client.post(url, {'quantity': MAX_CART_QUANTITY - 1}, **self.AJAX)
+        # The cached badge would overshoot to MAX + 4 if it were bumped by the requested amount
+        response = self.client.post(url, {'quantity': 5}, **self.AJAX)
+        self.assertEqual(response.json()['cart_count'], MAX_CART_QUANTITY)
+
+    def test_ajax_add_rejects_non_numeric_quantity(self):
+        response = self.client.post(f'/add-to-cart/{self.product.pk}/', {'quantity': 'abc'}, **self.AJAX)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CartItem.objects.filter(user=self.buyer).exists())
+
+    def test_cascaded_cart_deletes_drop_cached_count(self):
+        self.client.post(f'/add-to-cart/{self.product.pk}/', {'quantity': 3}, **self.AJAX)
+        self.assertEqual(cart_count(self.buyer.pk), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertEqual(cart_count(self.buyer.pk), 0)
@@ -0,0 +1,111 @@
+"""
+Buffered product view counting.
+
+product_detail records a view with a single Redis HINCRBY instead of an UPDATE
+on the product row. The core.flush_product_view_counts beat task (celery_beat
+service in docker-compose) folds the buffered counts into Product.view_count
+every minute. If no flush has happened for STALE_FLUSH_AFTER seconds, because
+beat is not running, the next recorded view flushes the buffer itself, so counts
+keep reaching the database and the buffer stays bounded. Without a Redis cache
+or when Redis is unreachable, the view is written straight to the database.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django_redis import get_redis_connection
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+PENDING_VIEWS_KEY = 'product_views:pending'
+FLUSHING_VIEWS_KEY = 'product_views:flushing'
+# Present while a flush ran within STALE_FLUSH_AFTER seconds
+RECENT_FLUSH_KEY = 'product_views:recently_flushed'
+# Held by whichever process (beat task or request) is flushing
+FLUSH_LOCK_KEY = 'product_views:flush_lock'
+
+STALE_FLUSH_AFTER = 300  # 5 minutes; beat flushes every minute
+FLUSH_LOCK_TIMEOUT = 60  # seconds
+
+
+def _redis():
+    """Raw client behind the default cache, or None when it is not django_redis"""
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        return None
+
+
+def _add_views(product_ids, count):
+    """Add count views to each product with one UPDATE"""
+    return Product.objects.filter(pk__in=product_ids).update(view_count=F('view_count') + count)
+
+
+def record_product_view(product_id):
+    """Count one view of a product without writing the product row on the request path"""
+    client = _redis()
+    if client is not None:
+        try:
+            # One round trip: buffer the view and check that someone is still flushing
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(PENDING_VIEWS_KEY, product_id, 1)
+            pipe.exists(RECENT_FLUSH_KEY)
+            _, recently_flushed = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Buffering view for product {product_id} failed, writing directly: {e}")
+            _add_views([product_id], 1)
+            return
+        if not recently_flushed:
+            # Beat is not flushing (e.g. no celery_beat service): do it here
+            try:
+                flush_product_views()
+            except Exception as e:
+                logger.error(f"Flushing buffered product views failed: {e}", exc_info=True)
+        return
+    _add_views([product_id], 1)
+
+
+def flush_product_views():
+    """
+    Move buffered view counts into Product.view_count.
+
+    Returns:
+        int: Number of products updated
+    """
+    client = _redis()
+    if client is None:
+        return 0
+    # The beat task and a request can both decide to flush; only one works on the batch
+    if not client.set(FLUSH_LOCK_KEY, 1, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        return _flush_claimed_views(client)
+    finally:
+        client.delete(FLUSH_LOCK_KEY)
+
+
+def _flush_claimed_views(client):
+    """Flush the buffer while holding FLUSH_LOCK_KEY"""
+    client.set(RECENT_FLUSH_KEY, 1, ex=STALE_FLUSH_AFTER)
+
+    # A leftover batch means an earlier flush died after claiming it; finish that one first
+    if not client.exists(FLUSHING_VIEWS_KEY):
+        if not client.exists(PENDING_VIEWS_KEY):
+            return 0
+        # Views recorded from now on land in a fresh pending hash
+        client.rename(PENDING_VIEWS_KEY, FLUSHING_VIEWS_KEY)
+
+    # Products with the same number of new views share one UPDATE
+    products_by_count = defaultdict(list)
+    for product_id, count in client.hgetall(FLUSHING_VIEWS_KEY).items():
+        products_by_count[int(count)].append(int(product_id))
+
+    with transaction.atomic():
+        for count, product_ids in products_by_count.items():
+            _add_views(product_ids, count)
+    client.delete(FLUSHING_VIEWS_KEY)
+
+    return sum(len(product_ids) for product_ids in products_by_count.values())
@@ -1,13 +1,19 @@
+import hashlib
+import logging
 import re
+import time
 import uuid
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate, update_session_auth_hash
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q, Max, F
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.db import transaction
+from django.db.models import Q, Max, F, Exists, OuterRef, Prefetch
+from django.http import Http404, JsonResponse
+from django.conf import settings
+from django.views.decorators.http import condition, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 import json 
@@ -18,13 +24,19 @@ from .models import (
     ProductImage, StoreCertification, StoreVerificationRequest,
     ReviewMedia, StoreReviewStats, ProductVariant,
     FlashSale, FlashSaleProduct, DiscountCode, DiscountCodeProduct,
-    CertificationOrganization
+    CertificationOrganization, OutOfStock, MAX_CART_QUANTITY
 )
 from .marketing_views import (
     store_flash_sale_list, store_flash_sale_create, store_flash_sale_edit, store_flash_sale_delete,
     store_discount_code_list, store_discount_code_create, store_discount_code_edit, store_discount_code_delete,
     get_store_products_ajax
 )
+from .cart_cache import bump_cart_count, invalidate_cart_count
+from .catalog_cache import all_categories
+from .fast_urls import fast_redirect
+from .paginator import FastCountPaginator
+from .signals import refresh_primary_image
+from .view_counter import record_product_view
 from .forms import (
     CustomUserRegistrationForm, LoginForm, ProductForm, AddressForm, ReviewForm, SearchForm, ProfileUpdateForm,
     StoreCertificationForm, AdminStoreReviewForm, PasswordChangeForm, ForgotPasswordForm, 
@@ -35,7 +47,9 @@ from .forms import (
 from chat.models import Message
 from notifications.tasks import create_order_status_notifications
 from datetime import timedelta
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, Q, Sum
+
+logger = logging.getLogger(__name__)
 
 
 # Helper Functions for Permissions and Business Logic
@@ -48,12 +62,71 @@ def has_user_purchased_product(user, product):
     ).exists()
 
 
+def add_gallery_images(product, images, start_order=0):
+    """
+    Attach uploaded gallery images to a product with a single INSERT.
+    
+    bulk_create skips ProductImage.save() and post_save, so renditions are
+    prepared here and the primary image is refreshed once at the end.
+    """
+    if not images:
+        return []
+    gallery = []
+    for i, image in enumerate(images):
+        product_image = ProductImage(
+            product=product,
+            image=image,
+            alt_text=f"{product.name} - Image {start_order + i + 1}",
+            order=start_order + i
+        )
+        product_image.prepare_renditions()
+        gallery.append(product_image)
+    ProductImage.objects.bulk_create(gallery)
+    refresh_primary_image(product.pk)
+    return gallery
+
+
+def active_certification_organizations(org_ids):
+    """Map the submitted organization ids to active organizations with one query"""
+    ids = {int(org_id) for org_id in org_ids if org_id and org_id.isdigit()}
+    if not ids:
+        return {}
+    return {str(pk): org for pk, org in CertificationOrganization.objects.filter(is_active=True).in_bulk(ids).items()}
+
+
+def add_certifications(verification_request, certifications):
+    """
+    Attach certification records to a verification request with a single INSERT.
+    
+    bulk_create skips StoreCertification.save() and post_save, so file_ext is
+    filled in here and cert_count is bumped once for the whole batch.
+    """
+    if not certifications:
+        return []
+    for certification in certifications:
+        certification.verification_request = verification_request
+        certification.prepare_file_ext()
+    StoreCertification.objects.bulk_create(certifications)
+    StoreVerificationRequest.objects.filter(
+        pk=verification_request.pk
+    ).update(cert_count=F('cert_count') + len(certifications))
+    return certifications
+
+
+def _qty(request, default=1, min_value=1, max_value=MAX_CART_QUANTITY):
+    """Parse the POSTed quantity once, falling back to default and clamping to a sane range"""
+    try:
+        quantity = int(request.POST.get('quantity', default))
+    except (TypeError, ValueError):
+        return default
+    return max(min_value, min(quantity, max_value))
+
+
 def get_user_purchased_products(user):
     """Get list of products user has purchased"""
     return Product.objects.filter(
-        order_items__order__user=user,
-        order_items__order__status='delivered'
-    ).distinct()
+        Exists(OrderItem.objects.filter(product=OuterRef('pk'), order__user=user, order__status='delivered'))
+    )
 
 
 def can_create_review(user, order_item):
@@ -72,41 +145,14 @@ def can_reply_review(user, review):
     """Check if user can reply to a review (must be shop owner and not already replied)"""
     if not user.is_authenticated:
         return False
-    if review.product.store.user != user:
+    if review.product.store.user_id != user.pk:
         return False
     return not review.has_seller_reply
 
 
-def update_store_review_stats(store):
-    """Update store review statistics"""
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    
-    # Get reviews in last 30 days
-    reviews_30d = Review.objects.filter(
-        product__store=store,
-        created_at__gte=thirty_days_ago,
-        is_approved=True
-    )
-    
-    total_reviews_30d = reviews_30d.count()
-    avg_rating_30d = reviews_30d.aggregate(Avg('rating'))['rating__avg'] or 0.00
-    good_reviews_count = reviews_30d.filter(rating__gte=4).count()
-    negative_reviews_count = reviews_30d.filter(rating__lte=2).count()
-    
-    # Get or create stats
-    stats, created = StoreReviewStats.objects.get_or_create(store=store)
-    stats.total_reviews_30d = total_reviews_30d
-    stats.avg_rating_30d = round(avg_rating_30d, 2)
-    stats.good_reviews_count = good_reviews_count
-    stats.negative_reviews_count = negative_reviews_count
-    stats.save()
-    
-    return stats
-
-
 def get_recent_reviews_since_last_access(store):
     """Get reviews created since last access"""
-    stats, created = StoreReviewStats.objects.get_or_create(store=store)
+    stats = StoreReviewStats.for_store(store)
     
     if stats.last_accessed_at:
         return Review.objects.filter(
@@ -130,25 +176,75 @@ def get_negative_reviews_needing_reply(store):
 
 
 # Home Page
+# Anonymous pages may be answered with 304 Not Modified for this long; the counters and
+# cached sections they show (flash sales, best sellers) are already up to a minute old
+ANON_ETAG_WINDOW = 60  # seconds
+
+
+def anonymous_etag(request, *parts):
+    """
+    ETag for a page rendered to an anonymous visitor, or None to always render.
+    
+    Mixes in the CSRF cookie (embedded in the page's forms) and the current
+    ANON_ETAG_WINDOW bucket; pages with pending flash messages always render.
+    """
+    if request.user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    bucket = int(time.time()) // ANON_ETAG_WINDOW
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    raw = '|'.join(str(part) for part in (*parts, bucket, csrf_cookie))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def home_etag(request):
+    """ETag for the anonymous home page"""
+    return anonymous_etag(request, 'home')
+
+
+def product_detail_etag(request, product_id):
+    """
+    ETag for an anonymous product page; changes when the product is edited.
+    
+    Anonymous views are recorded here because a 304 response never reaches product_detail.
+    """
+    if request.user.is_authenticated:
+        return None
+    updated_at = Product.objects.filter(pk=product_id).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    record_product_view(product_id)
+    return anonymous_etag(request, 'product', product_id, updated_at.timestamp())
+
+
+HOME_FLASH_SALE_CACHE_KEY = 'home:flash_sale_products:v1'
+HOME_FLASH_SALE_CACHE_TTL = 60  # 1 minute
+
+
+@condition(etag_func=home_etag)
 def home(request):
     """Home page - display categories and recommended products"""
     from recommendations.services import RecommendationService
     
-    categories = Category.objects.all()[:12]  # Display maximum 12 categories
+    categories = all_categories()[:12]  # Display maximum 12 categories
     
     # Get all products in ongoing flash sales, sorted by flash sale end_date (ending soonest first)
+    # The list is the same for every visitor, so it is cached briefly; countdowns use the live time below
     now = timezone.now()
-    flash_sale_products_queryset = FlashSaleProduct.objects.filter(
-        flash_sale__is_active=True,
-        flash_sale__start_date__lte=now,
-        flash_sale__end_date__gte=now
-    ).select_related(
-        'product', 
-        'product__store', 
-        'product__category',
-        'flash_sale',
-        'flash_sale__store'
-    ).order_by('flash_sale__end_date', 'created_at')[:20]  # Limit to 20 products
+    flash_sale_products_queryset = cache.get(HOME_FLASH_SALE_CACHE_KEY)
+    if flash_sale_products_queryset is None:
+        flash_sale_products_queryset = list(FlashSaleProduct.objects.filter(
+            flash_sale__is_active=True,
+            flash_sale__start_date__lte=now,
+            flash_sale__end_date__gte=now
+        ).select_related(
+            'product', 
+            'product__store', 
+            'product__category',
+            'product__primary_image',
+            'flash_sale',
+            'flash_sale__store'
+        ).order_by('flash_sale__end_date', 'created_at')[:20])  # Limit to 20 products
+        cache.set(HOME_FLASH_SALE_CACHE_KEY, flash_sale_products_queryset, HOME_FLASH_SALE_CACHE_TTL)
     
     # Calculate discount percentage and time remaining for each product
     flash_sale_products = []
@@ -186,9 +282,6 @@ def home(request):
         })
     
     # Get personalized recommendations
-    import logging
-    logger = logging.getLogger(__name__)
-    
     try:
         if request.user.is_authenticated:
             suggested_products = RecommendationService.get_personalized_recommendations(
@@ -254,9 +347,8 @@ def user_login(request):
                     messages.warning(request, 'Please verify your email before logging in.')
                     return redirect('otp_service:verify', user_id=user.user_id)
                 
-                # Email verified, allow login
+                # Email verified, allow login (login() stamps last_login via a narrow UPDATE)
                 login(request, user)
-                user.save()
                 messages.success(request, f'Welcome {user.full_name}!')
                 return redirect('home')
             else:
@@ -279,10 +371,7 @@ def product_list(request):
     """Product list"""
     from django.conf import settings
     from search_engine.services import ProductSearchService
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    categories = Category.objects.all()
+    categories = all_categories()
     certificates = CertificationOrganization.objects.all()
     
     # Search and filter
@@ -305,13 +394,10 @@ def product_list(request):
     products_queryset = None
     search_method_used = None
     
-    # Debug: Print search parameters
-    print(f"\n{'='*60}")
-    print(f"🔍 SEARCH DEBUG - Query: '{query}'")
-    print(f"   Category: {category}")
-    print(f"   Certificate: {certificate}")  # THÊM DÒNG NÀY
-    print(f"   USE_ELASTICSEARCH setting: {use_elasticsearch}")
-    print(f"{'='*60}\n")
+    logger.debug(
+        "Product search - query: %r, category: %s, certificate: %s, USE_ELASTICSEARCH: %s",
+        query, category, certificate, use_elasticsearch
+    )
     
     if use_elasticsearch and query:
         try:
@@ -326,7 +412,7 @@ def product_list(request):
             if max_price:
                 filters['max_price'] = max_price
             
-            print(f"🚀 Attempting Elasticsearch search with filters: {filters}")
+            logger.debug("Attempting Elasticsearch search with filters: %s", filters)
             
             # Use Elasticsearch search with fallback
             products_list = ProductSearchService.search_with_fallback(
@@ -338,71 +424,33 @@ def product_list(request):
             
             products_queryset = products_list
             search_method_used = 'Elasticsearch'
-            print(f"✅ SUCCESS: Using Elasticsearch - Found {len(products_list)} products")
-            logger.info(f"Using Elasticsearch for query: '{query}' - Found {len(products_list)} products")
+            logger.info("Using Elasticsearch for query: %r - Found %d products", query, len(products_list))
             
         except Exception as e:
-            print(f"❌ ERROR: Elasticsearch search failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            logger.warning(f"Elasticsearch search failed, using Django ORM fallback: {str(e)}")
-            logger.exception(e)
+            logger.warning("Elasticsearch search failed, using Django ORM fallback: %s", e, exc_info=True)
             use_elasticsearch = False
     
     # Fallback to Django ORM search (original method)
     if not use_elasticsearch or products_queryset is None:
-        print(f"🔄 Falling back to Django ORM search")
-        products = Product.objects.all()
+        logger.debug("Falling back to Django ORM search")
+        products = Product.objects.list_fields()
         
         if query:
-            products = products.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            )
+            products = products.search(query)
         if category:
             products = products.filter(category=category)
 
 
-        # FIX THIS LINE - Filter correctly through relationship
+        # Keep products whose store holds a valid (non-expired) certificate from an approved request
         if certificate:
-            # Iterate through each product
-            products_to_exclude = []
-        
-            for product in products:
-                # Which store does this product belong to?
-                store_id = product.store_id
-                
-                flag = 0
-                
-                # Does that store have a cert matching the certificate?
-                # Get approved requests for the store
-                verification_requests = StoreVerificationRequest.objects.filter(
-                    store_id=store_id,
-                    status='approved'  # status is CharField, use 'approved' not True
-                )
-                
-                for verification_request in verification_requests:
-                    # Get certifications in the approved request
-                    certs = StoreCertification.objects.filter(
-                        verification_request=verification_request,
-                        certification_organization=certificate  # Compare with CertificationOrganization object
-                    )
-                    
-                    # Check if any certification is still valid (not expired)
-                    for cert in certs:
-                        # Check if certification is still valid
-                        if cert.expiry_date is None or cert.expiry_date >= timezone.now().date():
-                            flag = 1
-                            break
-                    
-                    if flag == 1:
-                        break
-                
-                # If no matching certification found, mark for removal
-                if flag == 0:
-                    products_to_exclude.append(product.product_id)
-        
-            # Remove products without certification
-            products = products.exclude(product_id__in=products_to_exclude)
+            valid_certs = StoreCertification.objects.filter(
+                verification_request__store_id=OuterRef('store_id'),
+                verification_request__status='approved',
+                certification_organization=certificate,
+            ).filter(
+                Q(expiry_date__isnull=True) | Q(expiry_date__gte=timezone.now().date())
+            )
+            products = products.filter(Exists(valid_certs))
 
         if min_price:
             products = products.filter(price__gte=min_price)
@@ -412,12 +460,11 @@ def product_list(request):
         products_queryset = products
         if query:
             search_method_used = 'Django ORM'
-            count = products.count()
-            print(f"✅ Using Django ORM - Found {count} products")
-            logger.info(f"Using Django ORM for query: '{query}' - Found {count} products")
+            # The paginator counts again anyway; only pay for this COUNT when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Using Django ORM for query: %r - Found %d products", query, products.count())
     
-    print(f"📊 Final search method: {search_method_used}")
-    print(f"{'='*60}\n")
+    logger.debug("Final search method: %s", search_method_used)
     
     # Pagination
     # Handle both QuerySet and list
@@ -427,8 +474,8 @@ def product_list(request):
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
     else:
-        # For QuerySet, use standard pagination
-        paginator = Paginator(products_queryset, 12)
+        # For QuerySet, estimate the total when browsing the unfiltered catalogue
+        paginator = FastCountPaginator(products_queryset, 12)
         page_number = request.GET.get('page')
         page_obj = paginator.get_page(page_number)
     
@@ -442,24 +489,33 @@ def product_list(request):
     return render(request, 'core/product_list.html', context)
 
 
+# Number of reviews rendered inline on the product page
+PRODUCT_DETAIL_REVIEW_LIMIT = 20
+
+
+@condition(etag_func=product_detail_etag)
 def product_detail(request, product_id):
     """Product detail"""
     from recommendations.services import RecommendationService
     from recommendations.signals import track_product_view
     
-    product = get_object_or_404(Product, pk=product_id)
+    # Store, category and primary image in the same query; variants once for the price helpers too
+    product = get_object_or_404(
+        Product.objects.select_related('store', 'category', 'primary_image').prefetch_related('variants'),
+        pk=product_id
+    )
     
-    # Increment view count
+    # Buffer the view in Redis; a beat task writes counts to the product row every minute.
+    # Anonymous views were already recorded by product_detail_etag.
+    if request.user.is_authenticated:
+        record_product_view(product.pk)
     product.view_count += 1
-    product.save()
     
     # Track product view for recommendations (only for authenticated users)
     try:
         if request.user.is_authenticated:
             track_product_view(product, user=request.user)
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error tracking product view: {e}", exc_info=True)
     
     # Get variants if available
@@ -467,9 +523,8 @@ def product_detail(request, product_id):
     default_variant = None
     
     if product.has_variants:
-        variants_queryset = ProductVariant.objects.filter(product=product, is_active=True).order_by('created_at')
-        if variants_queryset.exists():
-            variants = list(variants_queryset)
+        variants = product.active_variants()
+        if variants:
             default_variant = variants[0]  # Get first variant as default
     
     # Create image list including variant images
@@ -481,6 +536,7 @@ def product_detail(request, product_id):
         gallery_images.append({
             'type': 'product',
             'url': img.image.url,
+            'thumb_url': img.thumb_url,
             'alt': img.alt_text or product.name,
             'index': image_index,
         })
@@ -501,16 +557,16 @@ def product_detail(request, product_id):
             variant_images_map[image_index] = variant.variant_id
             image_index += 1
     
-    # Get reviews
-    reviews = Review.objects.filter(product=product, is_approved=True).select_related('user').prefetch_related('media_files').order_by('-created_at')
+    # Get reviews (latest page only; the summary covers all approved reviews)
+    approved_reviews = Review.objects.filter(product=product, is_approved=True)
+    review_summary = approved_reviews.aggregate(avg=Avg('rating'), count=Count('review_id'))
+    reviews = approved_reviews.select_related('user').prefetch_related('media_files').order_by('-created_at')[:PRODUCT_DETAIL_REVIEW_LIMIT]
     
     # Get recommendations
     try:
         similar_products = RecommendationService.get_similar_products(product, limit=8)
         frequently_bought_together = RecommendationService.get_frequently_bought_together(product, limit=4)
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error getting recommendations in product_detail: {e}", exc_info=True)
         # Fallback to best selling
         similar_products = RecommendationService.get_best_selling_products(limit=8)
@@ -523,6 +579,7 @@ def product_detail(request, product_id):
         'gallery_images': gallery_images,
         'variant_images_map': variant_images_map,
         'reviews': reviews,
+        'review_summary': review_summary,
         'similar_products': similar_products,
         'frequently_bought_together': frequently_bought_together,
     }
@@ -534,7 +591,7 @@ def product_detail(request, product_id):
 def get_store_discount_codes(request, store_id):
     """API endpoint to get available discount codes for a store (active)"""
     try:
-        store = Store.objects.get(store_id=store_id)
+        store = Store.objects.card_fields().get(store_id=store_id)
         now = timezone.now()
         
         # Get active discount codes
@@ -569,8 +626,6 @@ def get_store_discount_codes(request, store_id):
             'error': 'Store not found'
         }, status=404)
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error getting discount codes: {e}", exc_info=True)
         return JsonResponse({
             'success': False,
@@ -583,10 +638,14 @@ def cart(request):
     """Shopping Cart - Grouped by Store"""
     from recommendations.services import RecommendationService
     
-    cart_items = CartItem.objects.filter(user=request.user).select_related('product', 'product__store', 'variant')
+    from decimal import Decimal
+    
+    cart_items = CartItem.objects.filter(user=request.user).with_totals().select_related('product', 'product__store', 'product__primary_image', 'variant')
     
-    # Group cart items by store
+    # Group cart items by store and total them in the same pass
+    # (line_total is computed by the database in with_totals())
     stores_dict = {}
+    total = Decimal('0')
     for item in cart_items:
         store = item.product.store
         if store.store_id not in stores_dict:
@@ -595,9 +654,7 @@ def cart(request):
                 'items': []
             }
         stores_dict[store.store_id]['items'].append(item)
-    
-    # Calculate totals
-    total = sum(item.total_price for item in cart_items)
+        total += item.line_total
     
     # Get recommendations based on cart items
     try:
@@ -643,8 +700,6 @@ def cart(request):
                 request.user, limit=8
             )
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error getting recommendations in cart view: {e}", exc_info=True)
         # Fallback to best selling
         recommendations = RecommendationService.get_best_selling_products(limit=8)
@@ -660,58 +715,68 @@ def cart(request):
 @login_required
 @require_POST
 def add_to_cart(request, product_id):
-    """Add product to cart"""
-    product = get_object_or_404(Product, pk=product_id)
-    quantity = int(request.POST.get('quantity', 1))
+    """Add product to cart (returns JSON for the product page's AJAX form)"""
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    if is_ajax and not request.POST.get('quantity', '1').strip().isdigit():
+        return JsonResponse({'success': False, 'message': 'Invalid quantity.'}, status=400)
+    quantity = _qty(request)
     variant_id = request.POST.get('variant_id')
     
     variant = None
     if variant_id:
-        variant = get_object_or_404(ProductVariant, pk=variant_id, product=product, is_active=True)
+        variant = get_object_or_404(ProductVariant, pk=variant_id, product_id=product_id, is_active=True)
         # Check stock
         if variant.stock < quantity:
+            if is_ajax:
+                return JsonResponse({'success': False, 'message': f'Only {variant.stock} items left in stock.'}, status=400)
             messages.error(request, f'Only {variant.stock} items left in stock.')
-            return redirect('product_detail', product_id=product_id)
+            return fast_redirect('product_detail', product_id=product_id)
     
-    cart_item, created = CartItem.objects.get_or_create(
-        user=request.user,
-        product=product,
-        variant=variant,
-        defaults={'quantity': quantity}
-    )
+    if is_ajax:
+        # Existence check only: the FK can't reject unknown products here because
+        # PostgreSQL defers it to COMMIT, outside any except around the INSERT
+        if not Product.objects.filter(pk=product_id).exists():
+            return JsonResponse({'success': False, 'message': 'Product not found.'}, status=404)
+        line_quantity = CartItem.objects.add(request.user, Product(pk=product_id), variant, quantity)
+        return JsonResponse({'success': True, 'cart_count': bump_cart_count(request.user.pk, quantity, line_quantity)})
     
-    if not created:
-        cart_item.quantity += quantity
-        cart_item.save()
+    product = get_object_or_404(Product, pk=product_id)
+    line_quantity = CartItem.objects.add(request.user, product, variant, quantity)
+    bump_cart_count(request.user.pk, quantity, line_quantity)
     
     messages.success(request, f'Added {product.name} to cart.')
-    return redirect('product_detail', product_id=product_id)
+    return fast_redirect('product_detail', product_id=product_id)
 
 
 @login_required
 @require_POST
 def remove_from_cart(request, cart_item_id):
     """Remove product from cart"""
-    cart_item = get_object_or_404(CartItem, pk=cart_item_id, user=request.user)
-    cart_item.delete()
+    deleted, _ = CartItem.objects.filter(pk=cart_item_id, user=request.user).delete()
+    if not deleted:
+        raise Http404('Cart item not found.')
+    invalidate_cart_count(request.user.pk)
     messages.success(request, 'Product removed from cart.')
-    return redirect('cart')
+    return fast_redirect('cart')
 
 
 @login_required
 @require_POST
 def update_cart_quantity(request, cart_item_id):
     """Update cart quantity"""
-    cart_item = get_object_or_404(CartItem, pk=cart_item_id, user=request.user)
-    quantity = int(request.POST.get('quantity', 1))
+    quantity = _qty(request, min_value=0)  # 0 removes the line
     
+    # Single UPDATE/DELETE scoped to the user instead of SELECT + save()
+    cart_item = CartItem.objects.filter(pk=cart_item_id, user=request.user)
     if quantity > 0:
-        cart_item.quantity = quantity
-        cart_item.save()
+        changed = cart_item.update(quantity=quantity, updated_at=timezone.now())
     else:
-        cart_item.delete()
+        changed, _ = cart_item.delete()
+    if not changed:
+        raise Http404('Cart item not found.')
+    invalidate_cart_count(request.user.pk)
     
-    return redirect('cart')
+    return fast_redirect('cart')
 
 
 
@@ -724,13 +789,13 @@ def checkout_select(request):
     raw_ids = request.POST.getlist('selected_items')
     if not raw_ids:
         messages.warning(request, 'No items selected for checkout.')
-        return redirect('cart')
+        return fast_redirect('cart')
     
     try:
         selected_ids = [int(x) for x in raw_ids]
     except ValueError:
         messages.warning(request, 'Invalid selected items.')
-        return redirect('cart')
+        return fast_redirect('cart')
     
     # Đảm bảo các cart item thuộc về user hiện tại
     valid_ids = list(
@@ -741,7 +806,7 @@ def checkout_select(request):
     )
     if not valid_ids:
         messages.warning(request, 'Selected items not found in cart.')
-        return redirect('cart')
+        return fast_redirect('cart')
     
     # Read applied discounts JSON from form (per-store discounts)
     applied_discounts_str = request.POST.get('applied_discounts', '{}')
@@ -764,16 +829,17 @@ def checkout(request):
     selected_ids = request.session.get('selected_cart_items')
     if not selected_ids:
         messages.warning(request, 'No items selected for checkout.')
-        return redirect('cart')
+        return fast_redirect('cart')
     
-    cart_items = CartItem.objects.filter(
+    # Materialize once; every step below reuses this list
+    cart_items = list(CartItem.objects.filter(
         user=request.user,
         cart_item_id__in=selected_ids,
-    ).select_related('product', 'product__store', 'variant')
+    ).with_totals().select_related('product', 'product__store', 'product__primary_image', 'variant'))
     
-    if not cart_items.exists():
+    if not cart_items:
         messages.warning(request, 'Selected items not found in cart.')
-        return redirect('cart')
+        return fast_redirect('cart')
     
     addresses = Address.objects.filter(user=request.user)
     
@@ -804,7 +870,7 @@ def checkout(request):
         stores_dict[store_id]['items'].append(item)
         
         # Tính subtotals
-        item_total = Decimal(str(item.total_price))
+        item_total = item.line_total
         store_subtotals[store_id] += item_total
         subtotal += item_total
     
@@ -828,8 +894,7 @@ def checkout(request):
         else:
             store_discounts[store_id] = 0.0  # Không có discount
     
-    print(applied_discounts)
-    print(store_discounts)
+    logger.debug("Checkout discounts - applied: %s, per store: %s", applied_discounts, store_discounts)
     if request.method == 'POST':
         shipping_address_id = request.POST.get('shipping_address')
         payment_method = request.POST.get('payment_method', 'cod')
@@ -931,39 +996,69 @@ def checkout(request):
         notes = request.POST.get('notes', '')
         created_orders = []
         
-        for store_id, store_data in stores_dict.items():
-            # Calculate subtotal and discount for this store
-            store_subtotal = store_subtotals[store_id]
-            store_discount = Decimal(str(store_discounts.get(store_id, 0)))
-            store_total = store_subtotal - store_discount + shipping_cost
-            
-            # Create order for this store
-            order = Order.objects.create(
-                user=request.user,
-                shipping_address=shipping_address,
-                subtotal=store_subtotal,
-                discount_amount=store_discount,
-                shipping_cost=shipping_cost,
-                total_amount=store_total,
-                payment_method=payment_method,
-                notes=notes
-            )
-            
-            # Create order items for this store
-            for cart_item in store_data['items']:
-                OrderItem.objects.create(
-                    order=order,
-                    product=cart_item.product,
-                    variant=cart_item.variant,
-                    quantity=cart_item.quantity,
-                    unit_price=cart_item.unit_price,
-                    total_price=cart_item.total_price
+        try:
+            with transaction.atomic():
+                # Lock the cart lines being ordered; a double submit or a concurrent cart edit
+                # blocks here and then sees the lines gone or changed instead of ordering twice
+                locked_lines = dict(
+                    CartItem.objects.select_for_update()
+                    .filter(user=request.user, cart_item_id__in=[item.cart_item_id for item in cart_items])
+                    .order_by('cart_item_id')
+                    .values_list('cart_item_id', 'quantity')
                 )
-            
-            created_orders.append(order)
-        
-        # Clear cart
-        cart_items.delete()
+                if locked_lines != {item.cart_item_id: item.quantity for item in cart_items}:
+                    messages.warning(request, 'Your cart changed during checkout. Please review it and try again.')
+                    return fast_redirect('cart')
+                
+                # Reserve variant stock first, in pk order so concurrent checkouts don't deadlock
+                variant_items = sorted(
+                    (item for item in cart_items if item.variant_id),
+                    key=lambda item: item.variant_id
+                )
+                for cart_item in variant_items:
+                    cart_item.variant.decrement_stock(cart_item.quantity)
+                
+                for store_id, store_data in stores_dict.items():
+                    # Calculate subtotal and discount for this store
+                    store_subtotal = store_subtotals[store_id]
+                    store_discount = Decimal(str(store_discounts.get(store_id, 0)))
+                    store_total = store_subtotal - store_discount + shipping_cost
+                    
+                    # Create order for this store
+                    order = Order.objects.create(
+                        user=request.user,
+                        shipping_address=shipping_address,
+                        subtotal=store_subtotal,
+                        discount_amount=store_discount,
+                        shipping_cost=shipping_cost,
+                        total_amount=store_total,
+                        payment_method=payment_method,
+                        notes=notes
+                    )
+                    
+                    # Create order items for this store in one INSERT
+                    OrderItem.objects.bulk_create([
+                        OrderItem(
+                            order=order,
+                            product=cart_item.product,
+                            variant=cart_item.variant,
+                            quantity=cart_item.quantity,
+                            unit_price=cart_item.unit_price
+                        )
+                        for cart_item in store_data['items']
+                    ])
+                    
+                    created_orders.append(order)
+                
+                # Clear cart
+                CartItem.objects.filter(
+                    user=request.user,
+                    cart_item_id__in=[item.cart_item_id for item in cart_items]
+                ).delete()
+                transaction.on_commit(lambda: invalidate_cart_count(request.user.pk))
+        except OutOfStock as e:
+            messages.error(request, f'Sorry, {e.variant} does not have enough stock left.')
+            return fast_redirect('cart')
         
         # Save checkout info to session for next time
         request.session['last_checkout_info'] = {
@@ -985,15 +1080,12 @@ def checkout(request):
     # Prepare store data with subtotals and discounts for template
     stores_data = []
     for store_id, store_data in stores_dict.items():
-        print(store_id)
-        print(store_discounts.get(store_id, 0))
         stores_data.append({
             'store': store_data['store'],
             'items': store_data['items'],
             'subtotal': store_subtotals.get(store_id, 0),
             'discount': store_discounts.get(store_id, 0),
         })
-    print(stores_data)
     # Calculate final total
     from decimal import Decimal
     # Flat shipping fee in GBP per store
@@ -1027,7 +1119,9 @@ def checkout(request):
 @login_required
 def order_list(request):
     """Order list"""
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders = Order.objects.filter(user=request.user).only(
+        'order_id', 'status', 'payment_method', 'total_amount', 'created_at'
+    ).order_by('-created_at')
     
     context = {
         'orders': orders,
@@ -1038,11 +1132,11 @@ def order_list(request):
 @login_required
 def order_detail(request, order_id):
     """Order detail"""
-    order = get_object_or_404(Order, pk=order_id, user=request.user)
+    order = get_object_or_404(Order.objects.select_related('shipping_address'), pk=order_id, user=request.user)
     
     # Group order items by store
     stores_dict = {}
-    for item in order.order_items.select_related('product', 'product__store', 'variant').all():
+    for item in order.order_items.select_related('product', 'product__store', 'product__primary_image', 'variant'):
         store = item.product.store
         if store.store_id not in stores_dict:
             stores_dict[store.store_id] = {
@@ -1051,15 +1145,20 @@ def order_detail(request, order_id):
             }
         stores_dict[store.store_id]['items'].append(item)
     
-    # Get reviews for order items and group by store
+    # Get reviews for order items in one query and group by store
+    reviews = {
+        review.order_item_id: review
+        for review in Review.objects.filter(user=request.user, order_item__order=order)
+    }
     stores_data = []
     for store_id, store_data in stores_dict.items():
         store_items_with_reviews = []
         store_subtotal = 0
         
         for item in store_data['items']:
-            review = Review.objects.filter(user=request.user, order_item=item).first()
-            can_review = can_create_review(request.user, item) if order.status == 'delivered' else False
+            review = reviews.get(item.order_item_id)
+            # Same rule as can_create_review(): order is the user's and delivered, no review yet
+            can_review = order.status == 'delivered' and review is None
             store_items_with_reviews.append({
                 'item': item,
                 'review': review,
@@ -1088,11 +1187,16 @@ def order_detail(request, order_id):
 def profile(request):
     """User profile"""
     user = request.user
-    recent_orders = Order.objects.filter(user=user).order_by('-created_at')[:5]
+    recent_orders = Order.objects.filter(user=user).only(
+        'order_id', 'status', 'payment_method', 'total_amount', 'created_at'
+    ).order_by('-created_at')[:5]
     
     # Check if user has any stores
-    user_stores = Store.objects.filter(user=user)
-    has_store = user_stores.exists()
+    # Listed once: the template renders the stores, so a separate exists() would be a second query
+    user_stores = list(Store.objects.filter(user=user).only(
+        'store_id', 'store_name', 'store_description', 'is_verified_status'
+    ))
+    has_store = bool(user_stores)
     
     if request.method == 'POST':
         form = ProfileUpdateForm(request.POST, request.FILES, instance=user)
@@ -1168,48 +1272,43 @@ def create_store(request):
             
             # Create certification records - ensure we have matching data
             if certification_files:
-                min_length = len(certification_files)
-                for i in range(min_length):
-                    file = certification_files[i]
+                from datetime import datetime
+                organizations = active_certification_organizations(certification_organizations)
+                certifications = []
+                for i, file in enumerate(certification_files):
+                    if not file:  # Only create if file is provided
+                        continue
                     cert_number = certificate_numbers[i] if i < len(certificate_numbers) and certificate_numbers[i] else ''
                     issue_date_str = issue_dates[i] if i < len(issue_dates) and issue_dates[i] else None
                     expiry_date_str = expiry_dates[i] if i < len(expiry_dates) and expiry_dates[i] else None
                     org_id = certification_organizations[i] if i < len(certification_organizations) and certification_organizations[i] else None
                     
-                    if file:  # Only create if file is provided
+                    certification = StoreCertification(
+                        certificate_number=cert_number,
+                        document=file,
+                        # Add organization if provided
+                        certification_organization=organizations.get(org_id),
+                    )
+                    
+                    # Parse dates
+                    if issue_date_str:
                         try:
-                            cert_data = {
-                                'verification_request': verification_request,
-                                'certificate_number': cert_number,
-                                'document': file,
-                            }
-                            
-                            # Parse dates
-                            if issue_date_str:
-                                try:
-                                    from datetime import datetime
-                                    cert_data['issue_date'] = datetime.strptime(issue_date_str, '%Y-%m-%d').date()
-                                except ValueError:
-                                    pass
-                            
-                            if expiry_date_str:
-                                try:
-                                    from datetime import datetime
-                                    cert_data['expiry_date'] = datetime.strptime(expiry_date_str, '%Y-%m-%d').date()
-                                except ValueError:
-                                    pass
-                            
-                            # Add organization if provided
-                            if org_id:
-                                try:
-                                    org = CertificationOrganization.objects.get(organization_id=org_id, is_active=True)
-                                    cert_data['certification_organization'] = org
-                                except CertificationOrganization.DoesNotExist:
-                                    pass
-                            
-                            StoreCertification.objects.create(**cert_data)
-                        except Exception as e:
-                            print(f"Error creating certification: {e}")
+                            certification.issue_date = datetime.strptime(issue_date_str, '%Y-%m-%d').date()
+                        except ValueError:
+                            pass
+                    
+                    if expiry_date_str:
+                        try:
+                            certification.expiry_date = datetime.strptime(expiry_date_str, '%Y-%m-%d').date()
+                        except ValueError:
+                            pass
+                    
+                    certifications.append(certification)
+                
+                try:
+                    add_certifications(verification_request, certifications)
+                except Exception as e:
+                    logger.error("Error creating certifications: %s", e, exc_info=True)
             
             messages.success(request, f'Store "{store_name}" created successfully! Verification request has been sent.')
             return redirect('store_dashboard', store_id=store.store_id)
@@ -1230,20 +1329,32 @@ def store_dashboard(request, store_id):
     """Store dashboard"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
     products = Product.objects.filter(store=store)
-    orders = Order.objects.filter(order_items__product__store=store).distinct().order_by('-created_at')[:10]
+    # EXISTS instead of JOIN + DISTINCT so aggregates count each order once
+    store_orders = Order.objects.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef('pk'), product__store=store))
+    )
+    orders = store_orders.select_related('user', 'shipping_address').order_by('-created_at')[:10]
     
     # Get verification requests
-    verification_requests = store.verification_requests.all()
-    latest_request = verification_requests.first()
+    # One query for the history and the latest request (Meta ordering is newest first)
+    verification_requests = list(store.verification_requests.all())
+    latest_request = verification_requests[0] if verification_requests else None
     
-    # Basic statistics
+    # Basic statistics (over all of the store's orders, not just the recent 10)
     total_products = products.count()
-    total_orders = orders.count()
-    total_revenue = sum(order.total_amount for order in orders if order.payment_status == 'paid')
+    total_orders = 0
+    recent_products = []
+    if total_products:
+        recent_products = products.order_by('-created_at')[:5]  # 5 most recent products
+        # Order items cascade with their product, so a store without products has no orders
+        total_orders = store_orders.count()
+    if not total_orders:
+        orders = []
+    total_revenue = store.lifetime_revenue  # Maintained by the order signals, no scan of paid orders
     
     context = {
         'store': store,
-        'products': products[:5],  # 5 most recent products
+        'products': recent_products,
         'orders': orders,
         'total_products': total_products,
         'total_orders': total_orders,
@@ -1258,10 +1369,10 @@ def store_dashboard(request, store_id):
 def store_products(request, store_id):
     """Store product management"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
-    products = Product.objects.filter(store=store).order_by('-created_at')
+    products = Product.objects.filter(store=store).list_fields('SKU').order_by('-created_at')
     
     # Pagination
-    paginator = Paginator(products, 10)
+    paginator = FastCountPaginator(products, 10, count_cache_ttl=0)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -1328,13 +1439,8 @@ def add_product(request, store_id):
             
             # Handle multiple gallery images
             gallery_images = request.FILES.getlist('gallery_images')
-            for i, image in enumerate(gallery_images[:10]):  # Limit to 10 images
-                ProductImage.objects.create(
-                    product=product,
-                    image=image,
-                    alt_text=f"{product.name} - Image {i+1}",
-                    order=i  # First image is order=0 (primary), then 1, 2, 3...
-                )
+            # First image is order=0 (primary), then 1, 2, 3...
+            add_gallery_images(product, gallery_images[:10])  # Limit to 10 images
             
             # Handle variants if has_variants is enabled
             if has_variants:
@@ -1401,13 +1507,13 @@ def add_product(request, store_id):
             else:
                 messages.success(request, f'Product "{product.name}" added successfully!')
             
-            return redirect('store_products', store_id=store.store_id)
+            return fast_redirect('store_products', store_id=store.store_id)
         else:
             messages.error(request, 'Please check the information again.')
     else:
         form = ProductForm()
     
-    categories = Category.objects.all()
+    categories = all_categories()
     context = {
         'store': store,
         'categories': categories,
@@ -1432,7 +1538,7 @@ def edit_product(request, store_id, product_id):
         if action == 'delete':
             product.delete()
             messages.success(request, f'Product "{product.name}" deleted successfully!')
-            return redirect('store_products', store_id=store.store_id)
+            return fast_redirect('store_products', store_id=store.store_id)
         elif action == 'update':
             form = ProductForm(request.POST, request.FILES, instance=product)
             if form.is_valid():
@@ -1571,13 +1677,7 @@ def edit_product(request, store_id, product_id):
                         # Continue from max_order + 1
                         start_order = max_order + 1
                     
-                    for i, image in enumerate(gallery_images[:10]):  # Limit to 10 images
-                        ProductImage.objects.create(
-                            product=product,
-                            image=image,
-                            alt_text=f"{product.name} - Image {start_order + i + 1}",
-                            order=start_order + i
-                        )
+                    add_gallery_images(product, gallery_images[:10], start_order)  # Limit to 10 images
                 
                 messages.success(request, f'Product "{product.name}" updated successfully!')
                 return redirect('edit_product', store_id=store.store_id, product_id=product.product_id)
@@ -1586,7 +1686,7 @@ def edit_product(request, store_id, product_id):
     else:
         form = ProductForm(instance=product)
     
-    categories = Category.objects.all()
+    categories = all_categories()
     variants = ProductVariant.objects.filter(product=product).order_by('created_at')
     context = {
         'store': store,
@@ -1648,7 +1748,22 @@ def get_product_variants(request, product_id):
 def store_orders(request, store_id):
     """View store orders"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
-    orders = Order.objects.filter(order_items__product__store=store).distinct().order_by('-created_at')
+    orders = Order.objects.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef('pk'), product__store=store))
+    ).select_related('user').only(
+        # Columns the order cards render; skips addresses, notes and the user's auth fields
+        'order_id', 'status', 'payment_status', 'created_at', 'user__full_name', 'user__email'
+    ).prefetch_related(
+        Prefetch(
+            'order_items',
+            queryset=OrderItem.objects.filter(product__store=store).only(
+                'order_item_id', 'order_id', 'product_id', 'quantity', 'total_price'
+            ),
+        ),
+        # A store's small catalogue repeats across orders: load each product once per page
+        # and share the instance between lines instead of joining it onto every line
+        Prefetch('order_items__product', queryset=Product.objects.only('product_id', 'name', 'store_id')),
+    ).order_by('-created_at')
     
     # Pagination
     paginator = Paginator(orders, 10)
@@ -1666,16 +1781,25 @@ def store_orders(request, store_id):
 def store_order_detail(request, store_id, order_id):
     """Store order detail"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
-    order = get_object_or_404(Order, pk=order_id)
     
-    # Get store products in the order
-    store_order_items = order.order_items.filter(product__store=store)
+    # Only orders containing this store's products, with those lines prefetched
+    order = Order.objects.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef('pk'), product__store=store)),
+        pk=order_id,
+    ).select_related('user', 'shipping_address').prefetch_related(
+        Prefetch(
+            'order_items',
+            queryset=OrderItem.objects.filter(product__store=store).select_related('product__store'),
+            to_attr='store_items'
+        )
+    ).first()
     
-    if not store_order_items.exists():
+    if order is None:
         messages.error(request, 'This order does not contain products from your store.')
         return redirect('store_orders', store_id=store.store_id)
     
     # Calculate store total in the order
+    store_order_items = order.store_items
     store_subtotal = sum(item.total_price for item in store_order_items)
     
     if request.method == 'POST':
@@ -1721,8 +1845,9 @@ def verification_status(request, store_id):
 def verification_management(request, store_id):
     """Store verification management page"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
-    verification_requests = store.verification_requests.all()
-    latest_request = verification_requests.first()
+    # One query for the history and the latest request (Meta ordering is newest first)
+    verification_requests = list(store.verification_requests.all())
+    latest_request = verification_requests[0] if verification_requests else None
     
     # Check if user can send new request
     can_send_new_request = True
@@ -1743,27 +1868,22 @@ def verification_management(request, store_id):
                 )
                 
                 # Create certification records
-                for i in range(len(certification_files)):
-                    file = certification_files[i]
+                organizations = active_certification_organizations(certification_organizations)
+                certifications = []
+                for i, file in enumerate(certification_files):
+                    if not file:
+                        continue
                     org_id = certification_organizations[i] if i < len(certification_organizations) and certification_organizations[i] else None
-                    
-                    if file:
-                        try:
-                            cert_data = {
-                                'verification_request': verification_request,
-                                'document': file
-                            }
-                            # Add organization if provided
-                            if org_id:
-                                try:
-                                    org = CertificationOrganization.objects.get(organization_id=org_id, is_active=True)
-                                    cert_data['certification_organization'] = org
-                                except CertificationOrganization.DoesNotExist:
-                                    pass
-                            
-                            StoreCertification.objects.create(**cert_data)
-                        except Exception as e:
-                            print(f"Error creating certification: {e}")
+                    certifications.append(StoreCertification(
+                        document=file,
+                        # Add organization if provided
+                        certification_organization=organizations.get(org_id),
+                    ))
+                
+                try:
+                    add_certifications(verification_request, certifications)
+                except Exception as e:
+                    logger.error("Error creating certifications: %s", e, exc_info=True)
                 
                 messages.success(request, f'New verification request #{verification_request.request_id} sent successfully!')
                 return redirect('verification_management', store_id=store.store_id)
@@ -1796,14 +1916,21 @@ def admin_required(user):
 def admin_dashboard(request):
     """Admin dashboard for reviewing stores"""
     # Get verification requests with different statuses
-    pending_requests = StoreVerificationRequest.objects.filter(status='pending').order_by('-submitted_at')
-    all_requests = StoreVerificationRequest.objects.all().order_by('-submitted_at')
-    
-    # Statistics
-    total_requests = StoreVerificationRequest.objects.count()
-    pending_count = pending_requests.count()
-    approved_count = StoreVerificationRequest.objects.filter(status='approved').count()
-    rejected_count = StoreVerificationRequest.objects.filter(status='rejected').count()
+    requests_qs = StoreVerificationRequest.objects.select_related('store__user', 'reviewed_by')
+    pending_requests = requests_qs.filter(status='pending').order_by('-submitted_at')
+    all_requests = requests_qs.order_by('-submitted_at')
+    
+    # Statistics in one pass over the table
+    stats = StoreVerificationRequest.objects.aggregate(
+        total=Count('pk'),
+        pending=Count('pk', filter=Q(status='pending')),
+        approved=Count('pk', filter=Q(status='approved')),
+        rejected=Count('pk', filter=Q(status='rejected')),
+    )
+    total_requests = stats['total']
+    pending_count = stats['pending']
+    approved_count = stats['approved']
+    rejected_count = stats['rejected']
     
     # Pagination for all requests
     paginator = Paginator(all_requests, 10)
@@ -1825,12 +1952,17 @@ def admin_dashboard(request):
 @user_passes_test(admin_required)
 def admin_store_detail(request, store_id):
     """Admin view for reviewing a specific store and its verification requests"""
-    store = get_object_or_404(Store, store_id=store_id)
-    verification_requests = store.verification_requests.all()
+    store = get_object_or_404(Store.objects.select_related('user'), store_id=store_id)
+    # One IN query loads the certifications of every request
+    verification_requests = list(store.verification_requests.prefetch_related(
+        Prefetch('certifications', queryset=StoreCertification.objects.select_related('certification_organization'))
+    ))
+    certifications = [cert for vr in verification_requests for cert in vr.certifications.all()]
     
     context = {
         'store': store,
         'verification_requests': verification_requests,
+        'certifications': certifications,
     }
     return render(request, 'core/admin/admin_store_detail.html', context)
 
@@ -1839,8 +1971,10 @@ def admin_store_detail(request, store_id):
 @user_passes_test(admin_required)
 def admin_request_detail(request, request_id):
     """Admin view for reviewing a specific verification request"""
-    verification_request = get_object_or_404(StoreVerificationRequest, request_id=request_id)
-    certifications = verification_request.certifications.all()
+    verification_request = get_object_or_404(
+        StoreVerificationRequest.objects.select_related('store__user', 'reviewed_by'), request_id=request_id
+    )
+    certifications = list(verification_request.certifications.select_related('certification_organization'))
     
     if request.method == 'POST':
         form = AdminStoreReviewForm(request.POST)
@@ -1922,7 +2056,10 @@ def admin_reject_store(request, store_id):
 @user_passes_test(admin_required)
 def admin_category_list(request):
     """List all categories"""
-    categories = Category.objects.all().order_by('name')
+    # Plain dicts with the product count aggregated in SQL (no per-row .products.count())
+    categories = Category.objects.values('category_id', 'name', 'slug').annotate(
+        product_count=Count('products')
+    ).order_by('name')
     
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -2011,7 +2148,9 @@ def admin_category_delete(request, category_id):
 @user_passes_test(admin_required)
 def admin_certification_organization_list(request):
     """List all certification organizations"""
-    organizations = CertificationOrganization.objects.all().order_by('name')
+    organizations = CertificationOrganization.objects.values(
+        'organization_id', 'name', 'abbreviation', 'description', 'website', 'is_active'
+    ).order_by('name')
     
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -2131,9 +2270,6 @@ def create_review(request, order_id, order_item_id):
                     order=len(images) + idx
                 )
             
-            # Update store review stats
-            update_store_review_stats(order_item.product.store)
-            
             messages.success(request, 'Review created successfully!')
             return redirect('order_detail', order_id=order_id)
         else:
@@ -2153,7 +2289,7 @@ def create_review(request, order_id, order_item_id):
 @require_POST
 def add_review_reply(request, review_id):
     """Add seller reply to a review"""
-    review = get_object_or_404(Review, pk=review_id)
+    review = get_object_or_404(Review.objects.select_related('product__store'), pk=review_id)
     
     if not can_reply_review(request.user, review):
         return JsonResponse({
@@ -2165,7 +2301,7 @@ def add_review_reply(request, review_id):
     if form.is_valid():
         review.seller_reply = form.cleaned_data['seller_reply']
         review.seller_replied_at = timezone.now()
-        review.save()
+        review.save(update_fields=['seller_reply', 'seller_replied_at', 'updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -2183,11 +2319,13 @@ def add_review_reply(request, review_id):
 
 def get_reviews_for_product(request, product_id):
     """Get reviews for a product (AJAX)"""
-    product = get_object_or_404(Product, pk=product_id)
+    product = get_object_or_404(Product.objects.select_related('store'), pk=product_id)
     reviews = Review.objects.filter(
         product=product,
         is_approved=True
-    ).select_related('user', 'product__store__user').prefetch_related('media_files').order_by('-created_at')
+    ).select_related('user').prefetch_related('media_files').order_by('-created_at')
+    # Every review is on this product, so the owner check is the same for all of them
+    is_store_owner = request.user.is_authenticated and product.store.user_id == request.user.pk
     
     reviews_data = []
     for review in reviews:
@@ -2209,7 +2347,7 @@ def get_reviews_for_product(request, product_id):
             'seller_reply': review.seller_reply,
             'seller_replied_at': review.seller_replied_at.strftime('%d/%m/%Y %H:%M') if review.seller_replied_at else None,
             'media': media_data,
-            'can_reply': can_reply_review(request.user, review) if request.user.is_authenticated else False,
+            'can_reply': is_store_owner and not review.has_seller_reply,
         })
     
     return JsonResponse({
@@ -2224,8 +2362,8 @@ def store_review_dashboard(request, store_id):
     """Store review dashboard with statistics"""
     store = get_object_or_404(Store, store_id=store_id, user=request.user)
     
-    # Update stats
-    stats = update_store_review_stats(store)
+    # Stats are kept current by Review signals and the nightly window roll
+    stats = StoreReviewStats.for_store(store)
     
     # Get recent reviews since last access
     recent_reviews = get_recent_reviews_since_last_access(store)
@@ -2236,9 +2374,9 @@ def store_review_dashboard(request, store_id):
     # Calculate order review rate (reviews / total delivered orders)
     from django.db.models import Count
     total_delivered_orders = Order.objects.filter(
-        order_items__product__store=store,
+        Exists(OrderItem.objects.filter(order=OuterRef('pk'), product__store=store)),
         status='delivered'
-    ).distinct().count()
+    ).count()
     
     total_reviews = Review.objects.filter(
         product__store=store,
@@ -5,7 +5,9 @@ ASGI config for organic_hub project.
 import os
 from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from django.urls import get_resolver
 
 from chat import routing as chat_routing
 from notifications import routing as notifications_routing
@@ -24,3 +26,7 @@ application = ProtocolTypeRouter({
         )
     ),
 })
+
+if not settings.DEBUG:
+    # Build the URL resolver in each web worker at startup instead of on its first request
+    get_resolver().reverse_dict
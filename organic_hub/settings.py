@@ -4,6 +4,7 @@ Django settings for organic_hub project.
 
 from pathlib import Path
 import os
+from celery.schedules import crontab
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     'django_elasticsearch_dsl',
     'core',
     'otp_service',
@@ -74,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.cart',
             ],
         },
     },
@@ -160,6 +163,11 @@ CACHES = {
     }
 }
 
+# Sessions are read from Redis and written through to the database, so a cache flush
+# or Redis restart does not log everyone out
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'default'
+
 # Celery Configuration
 RABBITMQ_HOST = os.getenv('RABBITMQ_HOST', 'localhost')
 RABBITMQ_USER = os.getenv('RABBITMQ_USER', 'guest')
@@ -170,6 +178,20 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Ho_Chi_Minh'
+# Requires a running worker and beat (celery_worker and celery_beat in docker-compose.yml)
+CELERY_BEAT_SCHEDULE = {
+    # Subtract reviews older than 30 days from StoreReviewStats
+    'roll-store-review-stats-window': {
+        'task': 'core.roll_store_review_stats_window',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    # Write product views buffered in Redis (core.view_counter) to Product.view_count.
+    # If this stops running, requests flush the buffer after STALE_FLUSH_AFTER seconds.
+    'flush-product-view-counts': {
+        'task': 'core.flush_product_view_counts',
+        'schedule': 60.0,
+    },
+}
 
 # Email Configuration (AWS SES)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
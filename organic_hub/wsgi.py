@@ -3,8 +3,14 @@ WSGI config for organic_hub project.
 """
 
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'organic_hub.settings')
 
 application = get_wsgi_application()
+
+if not settings.DEBUG:
+    # Build the URL resolver in each web worker at startup instead of on its first request
+    get_resolver().reverse_dict
@@ -71,7 +71,7 @@ class EmailOTP(models.Model):
         """Mark OTP as used"""
         self.is_used = True
         self.is_verified = True
-        self.save()
+        self.save(update_fields=['is_used', 'is_verified'])
     
     @classmethod
     def create_otp(cls, user, purpose='registration'):
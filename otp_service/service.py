@@ -22,15 +22,6 @@ class OTPService:
             # Generate OTP code
             otp_code = RedisOTPManager.generate_otp()
             
-            # Print OTP generation info
-            print(f"🔐 GENERATING OTP:")
-            print(f"   👤 User: {user.full_name} (ID: {user.user_id})")
-            print(f"   📧 Email: {user.email}")
-            print(f"   🔢 OTP Code: {otp_code}")
-            print(f"   🎯 Purpose: {purpose}")
-            print(f"   ⏰ Expires in: {getattr(settings, 'OTP_EXPIRY_MINUTES', 5)} minutes")
-            print("=" * 50)
-            
             # Store in Redis with TTL
             expiry_minutes = getattr(settings, 'OTP_EXPIRY_MINUTES', 5)
             RedisOTPManager.store_otp(user.user_id, otp_code, expiry_minutes)
@@ -40,7 +31,6 @@ class OTPService:
             otp_record = EmailOTP.create_otp(user, purpose)
             
             # Send email via Celery (async)
-            print(f"📤 QUEUEING EMAIL TASK...")
             send_otp_email_task.delay(user.user_id, otp_code, purpose)
             
             logger.info(f"OTP generated and sent for user {user.user_id}")
@@ -45,28 +45,15 @@ def send_otp_email_task(self, user_id: int, otp_code: str, purpose: str = 'regis
             fail_silently=False,
         )
         
-        print(f"✅ OTP EMAIL SENT SUCCESSFULLY!")
-        print(f"   📧 To: {user.email}")
-        print(f"   👤 User: {user.full_name}")
-        print(f"   🔢 OTP: {otp_code}")
-        print("=" * 50)
-        
         logger.info(f"OTP email sent successfully to {user.email} for user {user_id}")
         return f"OTP email sent successfully to {user.email}"
         
     except User.DoesNotExist:
-        print(f"❌ ERROR: User with ID {user_id} not found")
         logger.error(f"User with ID {user_id} not found")
         return f"User with ID {user_id} not found"
         
     except Exception as exc:
-        print(f"❌ ERROR SENDING OTP EMAIL:")
-        print(f"   👤 User ID: {user_id}")
-        print(f"   🚨 Error: {str(exc)}")
-        print(f"   🔄 Retry attempt: {self.request.retries + 1}/3")
-        print("=" * 50)
-        
-        logger.error(f"Failed to send OTP email to user {user_id}: {str(exc)}")
+        logger.error(f"Failed to send OTP email to user {user_id} (attempt {self.request.retries + 1}/3): {str(exc)}")
         
         # Retry with exponential backoff
         countdown = 2 ** self.request.retries
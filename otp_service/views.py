@@ -21,26 +21,18 @@ def verify_otp(request, user_id):
         return redirect('home')
     
     if request.method == 'POST':
-        print(f"🔐 OTP VERIFICATION DEBUG:")
-        print(f"   👤 User ID: {user_id}")
-        print(f"   📧 User Email: {user.email}")
-        print(f"   📝 POST Data: {request.POST}")
-        
         form = EmailOTPVerificationForm(request.POST)
-        print(f"   ✅ Form Valid: {form.is_valid()}")
         
         if form.is_valid():
             otp_code = form.cleaned_data['otp_code']
-            print(f"   🔢 OTP Code: {otp_code}")
             
             # Verify OTP using service
             result = OTPService.verify_otp(user_id, otp_code, purpose='registration')
-            print(f"   🎯 Verification Result: {result}")
             
             if result['success']:
                 # Mark user as verified
                 user.email_verified = True
-                user.save()
+                user.save(update_fields=['email_verified'])
                 
                 # Auto-login user
                 login(request, user)
@@ -50,7 +42,6 @@ def verify_otp(request, user_id):
             else:
                 messages.error(request, result['message'])
         else:
-            print(f"   ❌ Form Errors: {form.errors}")
             messages.error(request, 'Invalid data.')
     else:
         form = EmailOTPVerificationForm()
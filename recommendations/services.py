@@ -12,6 +12,9 @@ class RecommendationService:
     """Service for generating personalized product recommendations"""
     
     CACHE_TTL_BESTSELLING = 120  # 2 mintues - Only best selling products use cache
+    # One cached ranking serves every limit up to this size; invalidated by recommendations.signals
+    BESTSELLING_CACHE_KEY = 'rec:bestselling:v2'
+    BESTSELLING_CACHE_SIZE = 24
 
     @staticmethod
     def get_best_selling_products(limit: int = 6) -> List[Product]:
@@ -20,41 +23,19 @@ class RecommendationService:
         This method should never fail - it's the fallback for all other methods.
         """
         try:
-            cache_key = f'rec:bestselling:{limit}'
-            cached = cache.get(cache_key)
-            if cached:
-                product_ids = cached
-                products = Product.objects.filter(
-                    product_id__in=product_ids
-                )
-                # Preserve order
-                product_dict = {p.product_id: p for p in products}
-                return [product_dict[pid] for pid in product_ids if pid in product_dict]
-            
-            # Query best selling products
-            best_selling = OrderItem.objects.values('product').annotate(
-                total_sold=Sum('quantity')
-            ).order_by('-total_sold')[:limit]
-            
-            product_ids = [item['product'] for item in best_selling]
-            
-            # Get products
-            products = Product.objects.filter(
-                product_id__in=product_ids
-            )
-            # If we don't have enough products, fill with most viewed
-            if products.count() < limit:
-
-                remaining = limit - products.count()
-                viewed_products = Product.objects.filter().exclude(
-                    product_id__in=product_ids
-                ).order_by('-view_count')[:remaining]
-                products = list(products) + list(viewed_products)
-            
-            # Cache the result
-            cache.set(cache_key, product_ids, RecommendationService.CACHE_TTL_BESTSELLING)
+            if limit > RecommendationService.BESTSELLING_CACHE_SIZE:
+                return RecommendationService._query_best_selling_products(limit)
             
-            return list(products)
+            products = cache.get(RecommendationService.BESTSELLING_CACHE_KEY)
+            if products is None:
+                products = RecommendationService._query_best_selling_products(
+                    RecommendationService.BESTSELLING_CACHE_SIZE
+                )
+                cache.set(
+                    RecommendationService.BESTSELLING_CACHE_KEY, products,
+                    RecommendationService.CACHE_TTL_BESTSELLING
+                )
+            return products[:limit]
         except Exception as e:
             logger.error(f"Error in get_best_selling_products: {e}", exc_info=True)
             # Ultimate fallback: just return products ordered by view count
@@ -64,6 +45,33 @@ class RecommendationService:
                 logger.error(f"Ultimate fallback also failed: {e2}", exc_info=True)
                 return []
 
+    @staticmethod
+    def _query_best_selling_products(limit: int) -> List[Product]:
+        """Best sellers in rank order, topped up with the most viewed products"""
+        product_ids = list(
+            OrderItem.objects.values('product').annotate(
+                total_sold=Sum('quantity')
+            ).order_by('-total_sold').values_list('product', flat=True)[:limit]
+        )
+        
+        # Preserve order
+        product_dict = Product.objects.list_fields().in_bulk(product_ids)
+        products = [product_dict[pid] for pid in product_ids if pid in product_dict]
+        
+        # If we don't have enough products, fill with most viewed
+        if len(products) < limit:
+            products += list(
+                Product.objects.list_fields().exclude(
+                    product_id__in=product_ids
+                ).order_by('-view_count')[:limit - len(products)]
+            )
+        return products
+
+    @staticmethod
+    def invalidate_best_selling_cache():
+        """Drop the cached best seller ranking after products change"""
+        cache.delete(RecommendationService.BESTSELLING_CACHE_KEY)
+    
     @staticmethod
     def get_personalized_recommendations(user, limit: int = 12) -> List[Product]:
         """
@@ -225,13 +233,13 @@ class RecommendationService:
             
             # Same category products
             if product.category:
-                category_products = Product.objects.filter(
+                category_products = Product.objects.list_fields().filter(
                     category=product.category
                 ).exclude(product_id=product.product_id).order_by('-view_count')[:limit]
                 similar.extend(category_products)
             
             # Same store products
-            store_products = Product.objects.filter(
+            store_products = Product.objects.list_fields().filter(
                 store=product.store
             ).exclude(product_id=product.product_id).order_by('-view_count')[:limit]
             similar.extend(store_products)
@@ -296,7 +304,7 @@ class RecommendationService:
             if not product_ids:
                 return RecommendationService.get_best_selling_products(limit)
             
-            products = Product.objects.filter(
+            products = Product.objects.list_fields().filter(
                 product_id__in=product_ids
             )
             
@@ -1,17 +1,19 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from core.models import Product
 from .models import UserProductView
+from .services import RecommendationService
 
 
 @receiver(post_save, sender=Product)
-def track_product_view_signal(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=Product)
+def invalidate_best_selling_on_product_change(sender, instance, **kwargs):
     """
-    This signal is triggered when a product is saved.
-    Note: We'll track views manually in views.py when product_detail is accessed.
+    Drop the cached best seller list when a product is saved or deleted.
+    Note: view_count bumps in product_detail use update() and only refresh on cache expiry.
     """
-    pass
+    RecommendationService.invalidate_best_selling_cache()
 
 
 def track_product_view(product, user=None, session_key=None):
@@ -169,16 +169,14 @@ def setup_test_data():
             order=order1,
             product=products[0],
             quantity=2,
-            unit_price=products[0].price,
-            total_price=products[0].price * 2
+            unit_price=products[0].price
         )
         
         OrderItem.objects.create(
             order=order1,
             product=products[1],
             quantity=1,
-            unit_price=products[1].price,
-            total_price=products[1].price
+            unit_price=products[1].price
         )
         
         print(f"✓ Created order for {user1.phone_number}")
@@ -199,16 +197,14 @@ def setup_test_data():
             order=order2,
             product=products[2],
             quantity=1,
-            unit_price=products[2].price,
-            total_price=products[2].price
+            unit_price=products[2].price
         )
         
         OrderItem.objects.create(
             order=order2,
             product=products[3],
             quantity=1,
-            unit_price=products[3].price,
-            total_price=products[3].price
+            unit_price=products[3].price
         )
         
         print(f"✓ Created order for {user2.phone_number}")
@@ -213,8 +213,7 @@ def setup_enhanced_test_data():
                     order=order,
                     product=product,
                     quantity=quantity,
-                    unit_price=product.price,
-                    total_price=product.price * quantity
+                    unit_price=product.price
                 )
             
             order_counter += 1
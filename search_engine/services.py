@@ -98,7 +98,7 @@ class ProductSearchService:
             product_ids = [hit.product_id for hit in response]
             
             # Fetch Product objects from database in the same order
-            products = Product.objects.filter(product_id__in=product_ids).select_related('category', 'store')
+            products = Product.objects.filter(product_id__in=product_ids).list_fields()
             
             # Create a dictionary for O(1) lookup
             product_dict = {p.product_id: p for p in products}
@@ -156,7 +156,7 @@ class ProductSearchService:
         """
         from django.db.models import Q
         
-        products = Product.objects.all()
+        products = Product.objects.list_fields()
         
         # Apply text search
         if query: